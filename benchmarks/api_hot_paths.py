@@ -0,0 +1,254 @@
+"""Latency and throughput of the API hot paths, cache hot and cold.
+
+Runs the app in process (lifespan included) against the configured Postgres,
+with an in-memory fakeredis in place of Redis unless --redis real is given.
+Point it at a scratch database migrated to head; --seed fills it first:
+
+    pip install -r requirements-dev.txt
+    alembic upgrade head
+    python -m benchmarks.api_hot_paths --seed --projects 20000 --output results/main.json
+    python -m benchmarks.api_hot_paths --compare results/main.json
+
+Read scenarios run cold (caches flushed before every request, one at a time)
+and hot (caches warmed, --concurrency requests in flight). Write scenarios run
+once, with --concurrency requests in flight.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import func, select
+
+from benchmarks.seed import seed
+from src.config import cache_settings, db_settings, pricing_settings
+from src.db.database import async_engine, new_async_session
+from src.db.models import ProjectModel, ProjectRoleModel, RoleModel
+from src.main import app
+import src.services.cache as cache
+
+
+def use_fake_redis():
+    try:
+        from fakeredis import FakeAsyncRedis
+        import lupa  # noqa: F401 - the cache runs Lua scripts
+    except ImportError:
+        raise SystemExit("--redis fake needs fakeredis with Lua support: pip install 'fakeredis[lua]'")
+    cache.redis_client = FakeAsyncRedis()
+
+
+async def flush_caches():
+    cache.local_cache.clear()
+    await cache.redis_client.flushdb()
+
+
+async def pick_ids(sample_size: int) -> dict:
+    async with new_async_session() as session:
+        project_ids = (await session.execute(
+            select(ProjectRoleModel.project_id).distinct().limit(sample_size)
+        )).scalars().all()
+        role_ids = (await session.execute(select(RoleModel.id).limit(sample_size))).scalars().all()
+        projects = (await session.execute(select(func.count(ProjectModel.id)))).scalar_one()
+    if not project_ids or not role_ids:
+        raise SystemExit("No project roles: migrate and --seed the database first")
+    return {"project_ids": list(project_ids), "role_ids": list(role_ids), "projects": projects}
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    if len(latencies_ms) > 1:
+        cuts = statistics.quantiles(latencies_ms, n=100, method="inclusive")
+    else:
+        cuts = latencies_ms * 99
+    return {
+        "requests": len(latencies_ms),
+        "errors": errors,
+        "throughput_rps": round(len(latencies_ms) / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(cuts[49], 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+    }
+
+
+async def measure(client: httpx.AsyncClient, make_request, requests: int, concurrency: int, cold: bool) -> dict:
+    latencies = []
+    errors = 0
+    queue = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in queue:
+            if cold:
+                await flush_caches()
+            method, url, kwargs = await make_request(i)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(1 if cold else concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def read_scenarios(ids: dict) -> dict:
+    project_ids = ids["project_ids"]
+
+    def get(url_for):
+        async def make_request(i):
+            return "GET", url_for(i), {}
+        return make_request
+
+    return {
+        "calculate_project_cost": get(
+            lambda i: f"/calculator/projects/{random.choice(project_ids)}/calculate"
+        ),
+        "get_project_roles_by_project_id": get(
+            lambda i: f"/project-roles/project/{random.choice(project_ids)}"
+        ),
+        "get_roles": get(lambda i: "/roles/"),
+        "get_projects": get(lambda i: "/projects/"),
+    }
+
+
+def write_scenarios(client: httpx.AsyncClient, ids: dict, suffix: str) -> dict:
+    role_ids = ids["role_ids"]
+    created_projects = []
+    created_project_roles = []
+
+    async def create_project(i):
+        return "POST", "/projects/", {"json": {"name": f"bench-{suffix}-{i}", "coefficient": 1.1}}
+
+    async def update_project(i):
+        return "PUT", f"/projects/{random.choice(ids['project_ids'])}", {"json": {"coefficient": 1 + i % 50 / 100}}
+
+    async def create_project_role(i):
+        # A fresh project per request keeps every (project_id, role_id) pair unique
+        response = await client.post("/projects/", json={"name": f"bench-{suffix}-team-{i}", "coefficient": 1.0})
+        created_projects.append(response.json()["id"])
+        return "POST", "/project-roles/", {
+            "json": {"project_id": created_projects[-1], "role_id": random.choice(role_ids), "count": 2}
+        }
+
+    async def update_project_role(i):
+        if not created_project_roles:
+            async with new_async_session() as session:
+                created_project_roles.extend((await session.execute(
+                    select(ProjectRoleModel.id).where(ProjectRoleModel.project_id.in_(created_projects))
+                )).scalars().all())
+        return "PUT", f"/project-roles/{random.choice(created_project_roles)}", {"json": {"count": 1 + i % 5}}
+
+    return {
+        "create_project": create_project,
+        "update_project": update_project,
+        "create_project_role": create_project_role,
+        "update_project_role": update_project_role,
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: dict, baseline: dict | None):
+    width = max(len(name) for name in results)
+    print(f"{'scenario'.ljust(width)}  {'rps':>8}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  errors")
+    for name, result in results.items():
+        line = (f"{name.ljust(width)}  {result['throughput_rps']:8.1f}  {result['p50_ms']:8.2f}  "
+                f"{result['p95_ms']:8.2f}  {result['p99_ms']:8.2f}  {result['errors']}")
+        before = (baseline or {}).get(name)
+        if before and before["p95_ms"]:
+            line += f"  p95 {(result['p95_ms'] / before['p95_ms'] - 1) * 100:+.1f}%"
+        print(line)
+
+
+async def main(args) -> int:
+    random.seed(args.random_seed)
+    if args.redis == "fake":
+        use_fake_redis()
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    try:
+        if args.seed:
+            await seed(args.projects, args.roles, args.team_size)
+        ids = await pick_ids(args.sample_size)
+
+        results = {}
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                # Startup warmup runs in the background: let it finish before anything is timed
+                while (await client.get("/monitoring/ready")).status_code != 200:
+                    await asyncio.sleep(0.1)
+                for name, make_request in read_scenarios(ids).items():
+                    results[f"{name}:cold"] = await measure(
+                        client, make_request, args.cold_requests, args.concurrency, cold=True
+                    )
+                    await flush_caches()
+                    await measure(client, make_request, args.warmup, args.concurrency, cold=False)
+                    results[f"{name}:hot"] = await measure(
+                        client, make_request, args.requests, args.concurrency, cold=False
+                    )
+                suffix = uuid.uuid4().hex[:8]
+                for name, make_request in write_scenarios(client, ids, suffix).items():
+                    results[name] = await measure(client, make_request, args.write_requests, args.concurrency, False)
+    finally:
+        await async_engine.dispose()
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "redis": args.redis,
+            "dataset": {"projects": ids["projects"], "seeded": args.seed},
+            "concurrency": args.concurrency,
+            "settings": {
+                "db_pool_size": db_settings.DB_POOL_SIZE,
+                "cache_codec": cache_settings.CACHE_CODEC,
+                "cache_l1_enabled": cache_settings.CACHE_L1_ENABLED,
+                "pricing_incremental": pricing_settings.PRICING_INCREMENTAL,
+                "price_write_behind": pricing_settings.PRICE_WRITE_BEHIND,
+            },
+        },
+        "results": results,
+    }
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if any(result["errors"] for result in results.values()) else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", action="store_true", help="insert the dataset below before measuring")
+    parser.add_argument("--projects", type=int, default=20000)
+    parser.add_argument("--roles", type=int, default=200)
+    parser.add_argument("--team-size", type=int, default=8, help="roles assigned to every seeded project")
+    parser.add_argument("--redis", choices=("fake", "real"), default="fake")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per hot read scenario")
+    parser.add_argument("--cold-requests", type=int, default=200, help="requests per cold read scenario")
+    parser.add_argument("--write-requests", type=int, default=300, help="requests per write scenario")
+    parser.add_argument("--warmup", type=int, default=200, help="untimed requests before each hot run")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--sample-size", type=int, default=500, help="distinct projects and roles to hit")
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="JSON report of an earlier run to compare p95 against")
+    sys.exit(asyncio.run(main(parser.parse_args())))
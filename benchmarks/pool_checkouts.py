@@ -0,0 +1,103 @@
+"""Pool checkouts per request, with and without the per-request unit of work.
+
+Runs the API in process against the configured Postgres and Redis and counts
+connection-pool checkouts for each call of a typical write-then-read scenario:
+
+    python -m benchmarks.pool_checkouts --team-size 30
+"""
+import argparse
+import asyncio
+import uuid
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import event
+
+from src.api.__init__ import main_router
+from src.db.database import async_engine
+from src.main import app as unit_of_work_app
+
+
+def build_app_without_unit_of_work() -> FastAPI:
+    app = FastAPI()
+    app.include_router(main_router)
+    return app
+
+
+class CheckoutCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+async def run_scenario(app: FastAPI, counter: CheckoutCounter, team_size: int) -> list[tuple[str, int]]:
+    results = []
+
+    async def call(client: httpx.AsyncClient, method: str, url: str, label: str, **kwargs):
+        before = counter.count
+        response = await client.request(method, url, **kwargs)
+        response.raise_for_status()
+        results.append((label, counter.count - before))
+        return response
+
+    suffix = uuid.uuid4().hex[:8]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        project = (await call(client, "POST", "/projects/", "POST /projects/",
+                              json={"name": f"bench-{suffix}", "coefficient": 1.2})).json()
+        role_ids = []
+        for i in range(team_size):
+            role = (await call(client, "POST", "/roles/", "POST /roles/",
+                               json={"name": f"bench-{suffix}-{i}", "default_rate": 100 + i})).json()
+            role_ids.append(role["id"])
+
+        project_role_ids = []
+        for role_id in role_ids:
+            project_role = (await call(client, "POST", "/project-roles/", "POST /project-roles/",
+                                       json={"project_id": project["id"], "role_id": role_id, "count": 2})).json()
+            project_role_ids.append(project_role["id"])
+
+        await call(client, "GET", f"/project-roles/project/{project['id']}", "GET /project-roles/project/{id}")
+        await call(client, "GET", f"/calculator/projects/{project['id']}/calculate",
+                   "GET /calculator/projects/{id}/calculate")
+        await call(client, "PUT", f"/project-roles/{project_role_ids[0]}", "PUT /project-roles/{id}",
+                   json={"count": 3})
+        await call(client, "PUT", f"/roles/{role_ids[0]}", "PUT /roles/{id}", json={"default_rate": 999})
+        for project_role_id in project_role_ids:
+            await call(client, "DELETE", f"/project-roles/{project_role_id}", "DELETE /project-roles/{id}")
+        for role_id in role_ids:
+            await call(client, "DELETE", f"/roles/{role_id}", "DELETE /roles/{id}")
+        await call(client, "DELETE", f"/projects/{project['id']}", "DELETE /projects/{id}")
+    return results
+
+
+def summarize(results: list[tuple[str, int]]) -> dict[str, float]:
+    totals: dict[str, list[int]] = {}
+    for label, checkouts in results:
+        totals.setdefault(label, []).append(checkouts)
+    return {label: sum(values) / len(values) for label, values in totals.items()}
+
+
+async def main(team_size: int):
+    counter = CheckoutCounter()
+    event.listen(async_engine.sync_engine, "checkout", counter)
+    try:
+        before = summarize(await run_scenario(build_app_without_unit_of_work(), counter, team_size))
+        after = summarize(await run_scenario(unit_of_work_app, counter, team_size))
+    finally:
+        event.remove(async_engine.sync_engine, "checkout", counter)
+        await async_engine.dispose()
+
+    width = max(len(label) for label in before)
+    print(f"{'request'.ljust(width)}  before  after")
+    for label, checkouts in before.items():
+        print(f"{label.ljust(width)}  {checkouts:6.2f}  {after[label]:5.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--team-size", type=int, default=30, help="roles assigned to the benchmark project")
+    args = parser.parse_args()
+    asyncio.run(main(args.team_size))
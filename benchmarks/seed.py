@@ -0,0 +1,36 @@
+"""Realistically large synthetic dataset for the benchmarks and the query-plan tests."""
+from sqlalchemy import text
+
+from src.db.database import async_engine
+
+SEED_STATEMENTS = [
+    """
+    INSERT INTO roles (name, default_rate)
+    SELECT 'role-' || i, 1000 + i FROM generate_series(1, :roles) AS i
+    """,
+    """
+    INSERT INTO projects (name, coefficient, total_price, base_cost, created_at)
+    SELECT 'project-' || i, 1 + (i % 50) / 100.0, 0, 0, now() - make_interval(secs => i)
+    FROM generate_series(1, :projects) AS i
+    """,
+    # (p * 7 + k) % roles is distinct for k < team_size <= roles: one row per (project, role)
+    """
+    INSERT INTO project_roles (project_id, role_id, count, custom_rate)
+    SELECT p.id, r.id, 1 + k % 3, CASE WHEN k % 4 = 0 THEN 500 + k END
+    FROM (SELECT id, row_number() OVER (ORDER BY id) AS n FROM projects) AS p
+    CROSS JOIN generate_series(0, :team_size - 1) AS k
+    JOIN (SELECT id, row_number() OVER (ORDER BY id) - 1 AS n FROM roles) AS r
+        ON r.n = (p.n * 7 + k) % :roles
+    """,
+]
+
+
+async def seed(projects: int, roles: int, team_size: int):
+    if team_size > roles:
+        raise SystemExit("--team-size must not exceed --roles")
+    async with async_engine.begin() as conn:
+        for statement in SEED_STATEMENTS:
+            await conn.execute(text(statement), {"projects": projects, "roles": roles, "team_size": team_size})
+    async with async_engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("ANALYZE projects, roles, project_roles"))
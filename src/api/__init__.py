@@ -4,10 +4,15 @@ from src.api.role import router as role_router
 from src.api.project import router as project_router
 from src.api.project_role import router as project_role_router
 from src.api.calculator import router as calculator_router
+from src.api.pricing_rule import router as pricing_rule_router
+from src.api.monitoring import router as monitoring_router, metrics_router
 
 main_router = APIRouter()
 
 main_router.include_router(project_router)
 main_router.include_router(role_router)
 main_router.include_router(project_role_router)
-main_router.include_router(calculator_router)
\ No newline at end of file
+main_router.include_router(calculator_router)
+main_router.include_router(pricing_rule_router)
+main_router.include_router(monitoring_router)
+main_router.include_router(metrics_router)
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Response, status
+from typing import Optional
 
+from src.config import pricing_settings
 from src.repositories.project import ProjectCRUD
-from src.repositories.project_role import ProjectRoleCRUD
-from src.repositories.role import RoleCRUD
-from src.services.calculator import calculate_cost
+from src.schemas.calculator import (ProjectBatchCalculateRequest, ProjectBatchCalculateResponse, ProjectCostResult,
+                                    ProjectScenarioRequest, ProjectScenarioResponse, ScenarioAxis,
+                                    SCENARIO_MAX_POINTS)
+from src.services.etag import etag_matches, not_modified, project_cost_etag
+from src.services.metrics import PROJECTS_PRICED
+from src.services.price_writer import price_writer
+from src.services.pricing_rules import PricingPlan, current_pricing_plan
 
 router = APIRouter(prefix="/calculator", tags=["Calculator"])
 
@@ -11,44 +17,185 @@ router = APIRouter(prefix="/calculator", tags=["Calculator"])
 @router.get(
     "/projects/{project_id}/calculate",
     summary="Calculate project cost",
-    description="Calculate the total cost for a project based on roles and coefficients"
+    description="Calculate the total cost for a project based on roles and coefficients. Sends an ETag; "
+                "a matching If-None-Match gets 304 from a cached version lookup, without pricing anything."
 )
-async def calculate_project_cost(project_id: int):
+async def calculate_project_cost(project_id: int, response: Response, if_none_match: Optional[str] = Header(None)):
+    plan = await current_pricing_plan()
+    if if_none_match:
+        versions = await ProjectCRUD.get_project_versions(project_id)
+        if versions is not None and etag_matches(if_none_match, project_cost_etag(project_id, versions, plan.version)):
+            return not_modified(project_cost_etag(project_id, versions, plan.version))
 
-    project = await ProjectCRUD.get_project_by_id(project_id)
-    if not project:
+    # The incrementally maintained price follows the rules in force: publishing a rule set reprices every project
+    if pricing_settings.PRICING_INCREMENTAL:
+        result = await read_project_cost(project_id, plan.version)
+    else:
+        result = await compute_project_cost(project_id, plan)
+
+    response.headers["ETag"] = project_cost_etag(project_id, result["project"].model_dump(), plan.version)
+    return result
+
+
+async def compute_project_cost(project_id: int, plan: PricingPlan):
+    snapshot = await ProjectCRUD.get_pricing_snapshot(project_id, primary=True)
+    if not snapshot:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
 
-    project_roles = await ProjectRoleCRUD.get_project_roles_by_project_id(project_id)
-    if not project_roles:
+    if not snapshot.team_roles:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No roles found for this project"
         )
 
-    team_roles = []
-    for pr in project_roles:
-        role = await RoleCRUD.get_role_by_id(pr.role_id)
-        if not role:
-            continue
+    project = snapshot.project
+    team_roles = [role.model_dump() for role in snapshot.team_roles]
 
-        team_roles.append({
-            "count": pr.count,
-            "rate": pr.custom_rate if pr.custom_rate is not None else role.default_rate
-        })
+    total_price = plan.price_team(team_roles, project.coefficient, project.rush)
+    PROJECTS_PRICED.labels("single").inc()
+    # The response (and its ETag) describes the row as the price write leaves it
+    if pricing_settings.PRICE_WRITE_BEHIND:
+        price_writer.submit(project.id, total_price, project.total_price)
+        version = project.version + 1 if int(total_price) != project.total_price else project.version
+    else:
+        version = await ProjectCRUD.set_project_price(project.id, total_price)
+    if version is not None and version != project.version:
+        project = project.model_copy(update={"total_price": int(total_price), "version": version})
 
+    return {
+        "project": project,
+        "total_price": total_price,
+        "pricing_version": plan.version
+    }
 
-    coefficients = [project.coefficient]
 
-    total_price = calculate_cost(team_roles, coefficients)
-    if total_price > 2000000000:
-        total_price = 2000000000
-    await ProjectCRUD.set_project_price(project.id, total_price)
+@router.post(
+    "/projects/{project_id}/scenarios",
+    response_model=ProjectScenarioResponse,
+    summary="What-if pricing",
+    description="Price a grid of headcount, rate and coefficient variations of a project's team. "
+                "Nothing is stored: the project and its team are read once and left untouched."
+)
+async def calculate_project_scenarios(project_id: int, scenario: ProjectScenarioRequest):
+    snapshot = await ProjectCRUD.get_pricing_snapshot(project_id)
+    if not snapshot:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    if not snapshot.team_roles:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No roles found for this project"
+        )
+
+    plan = await current_pricing_plan()
+    project = snapshot.project
+    team = {role.role_id: role for role in snapshot.team_roles}
+    varied = {}
+    for variation in scenario.roles:
+        if variation.role_id not in team:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Role {variation.role_id} is not on this project's team"
+            )
+        if variation.role_id in varied:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Role {variation.role_id} is varied more than once"
+            )
+        varied[variation.role_id] = variation
+
+    axes = []
+    team_axes = []
+    for role_id, variation in varied.items():
+        counts, rates = team[role_id].count, team[role_id].rate
+        if variation.counts is not None:
+            counts = variation.counts
+            axes.append(ScenarioAxis(parameter="count", role_id=role_id, values=counts))
+        if variation.rates is not None:
+            rates = variation.rates
+            axes.append(ScenarioAxis(parameter="rate", role_id=role_id, values=rates))
+        team_axes.append((role_id, counts, rates))
+    coefficients = project.coefficient
+    if scenario.coefficients is not None:
+        coefficients = scenario.coefficients
+        axes.append(ScenarioAxis(parameter="coefficient", values=coefficients))
+
+    points = 1
+    for axis in axes:
+        points *= len(axis.values)
+    if points > SCENARIO_MAX_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Scenario grid has {points} points, at most {SCENARIO_MAX_POINTS} are allowed"
+        )
 
+    team_roles = [role.model_dump() for role in snapshot.team_roles]
+    fixed_roles = [role for role in team_roles if role["role_id"] not in varied]
+    return ProjectScenarioResponse(
+        project_id=project.id,
+        pricing_version=plan.version,
+        current_total_price=plan.price_team(team_roles, project.coefficient, project.rush),
+        axes=axes,
+        prices=plan.price_surface(fixed_roles, team_axes, coefficients, project.rush).tolist(),
+    )
+
+
+async def read_project_cost(project_id: int, pricing_version: int):
+    # total_price is kept current by every project-role write, so no recompute is needed
+    priced = await ProjectCRUD.get_project_price(project_id)
+    if not priced:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    project, has_roles = priced
+    if not has_roles:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No roles found for this project"
+        )
+
+    PROJECTS_PRICED.labels("stored").inc()
     return {
         "project": project,
-        "total_price": total_price
-    }
\ No newline at end of file
+        "total_price": project.total_price,
+        "pricing_version": pricing_version
+    }
+
+
+@router.post(
+    "/projects/calculate",
+    response_model=ProjectBatchCalculateResponse,
+    summary="Calculate cost for many projects",
+    description="Calculate and store total costs for a list of projects or for every project matching a filter"
+)
+async def calculate_projects_cost(batch: ProjectBatchCalculateRequest):
+    plan = await current_pricing_plan()
+    projects, team_rows = await ProjectCRUD.get_pricing_rows(batch)
+
+    results = []
+    prices = {}
+    for project_id, total_price in plan.price_projects(projects, team_rows):
+        if total_price is None:
+            results.append(ProjectCostResult(project_id=project_id, detail="No roles found for this project"))
+            continue
+        prices[project_id] = total_price
+        results.append(ProjectCostResult(project_id=project_id, total_price=total_price))
+
+    if batch.project_ids is not None:
+        found = {row[0] for row in projects}
+        for project_id in dict.fromkeys(batch.project_ids):
+            if project_id not in found:
+                results.append(ProjectCostResult(project_id=project_id, detail="Project not found"))
+
+    PROJECTS_PRICED.labels("batch").inc(len(prices))
+    await ProjectCRUD.set_project_prices(prices)
+
+    return ProjectBatchCalculateResponse(pricing_version=plan.version, results=results)
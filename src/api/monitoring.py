@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Response, status
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+
+from src.db.database import get_pool_stats
+from src.services.cache import get_cache_stats
+from src.services.metrics import RuntimeStatsCollector
+from src.services.warmup import warmup
+
+router = APIRouter(prefix="/monitoring", tags=["Monitoring"])
+metrics_router = APIRouter(tags=["Monitoring"])
+
+REGISTRY.register(RuntimeStatsCollector(get_pool_stats, get_cache_stats))
+
+
+@metrics_router.get(
+    "/metrics",
+    summary="Prometheus metrics",
+    description="Request, cache, database and calculator metrics of this worker in the Prometheus text format"
+)
+async def metrics():
+    return Response(content=generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
+@router.get(
+    "/cache",
+    summary="Cache statistics",
+    description="Hit ratio, eviction and error counters for the in-process and Redis cache tiers of this worker"
+)
+async def cache_stats():
+    return get_cache_stats()
+
+
+@router.get(
+    "/db-pool",
+    summary="Database pool statistics",
+    description="Checked-out, overflow and wait-time gauges of this worker's connection pool"
+)
+async def db_pool_stats():
+    return get_pool_stats()
+
+
+@router.get(
+    "/ready",
+    summary="Readiness probe",
+    description="200 once this worker has opened its pools and pre-filled its caches, 503 while warming up "
+                "or shutting down; the body lists every warmup step and the last error of a failing one"
+)
+async def readiness(response: Response):
+    if not warmup.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return warmup.report()
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, HTTPException, status
+from typing import List
+
+from src.repositories.pricing_rule import PricingRuleCRUD
+from src.repositories.project import ProjectCRUD
+from src.schemas.pricing_rule import PricingRuleSetCreate, PricingRuleSetCreateResponse, PricingRuleSetResponse
+from src.services.pricing_rules import get_pricing_plan
+
+router = APIRouter(prefix="/pricing-rules", tags=["Pricing rules"])
+
+
+@router.post(
+    "/",
+    response_model=PricingRuleSetCreateResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Publish pricing rules",
+    description="Store a new version of the pricing rules and reprice every project under it; "
+                "it takes effect for every calculation from now on"
+)
+async def create_rule_set(rule_set: PricingRuleSetCreate):
+    new_rule_set = await PricingRuleCRUD.create_rule_set(rule_set)
+    plan = get_pricing_plan(new_rule_set.version, new_rule_set.rules.model_dump())
+    repriced_project_ids = await ProjectCRUD.reprice_all_projects(plan)
+    return PricingRuleSetCreateResponse(
+        **new_rule_set.model_dump(), repriced_projects=len(repriced_project_ids)
+    )
+
+
+@router.get(
+    "/",
+    response_model=List[PricingRuleSetResponse],
+    summary="Get pricing rule versions",
+    description="Get every published version of the pricing rules, newest first"
+)
+async def get_rule_sets():
+    return await PricingRuleCRUD.get_rule_sets()
+
+
+@router.get(
+    "/current",
+    summary="Get pricing rules in force",
+    description="Get the version and rules used by the calculator; version 0 means no rules have been published"
+)
+async def get_current_rule_set():
+    return await PricingRuleCRUD.get_current_rule_set()
+
+
+@router.get(
+    "/{version}",
+    response_model=PricingRuleSetResponse,
+    summary="Get pricing rule version",
+    description="Get one published version of the pricing rules"
+)
+async def get_rule_set(version: int):
+    result = await PricingRuleCRUD.get_rule_set(version)
+
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pricing rule set not found"
+        )
+
+    return result
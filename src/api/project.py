@@ -1,8 +1,13 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from typing import Annotated, Optional
 
-from src.repositories.project import ProjectCRUD
-from src.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse
+from src.db.database import no_unit_of_work
+from src.repositories.project import ProjectCRUD, EXPORT_COLUMNS
+from src.schemas.project import (ProjectCreate, ProjectUpdate, ProjectResponse, ProjectListParams, ProjectPage,
+                                ProjectExportParams)
+from src.services.etag import etag_matches, not_modified, project_etag
+from src.services.export import encode_rows, start_batches, MEDIA_TYPES
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
@@ -28,21 +33,49 @@ async def create_project(project: ProjectCreate):
 
 @router.get(
     "/",
-    response_model=List[ProjectResponse],
-    summary="Get all projects",
-    description="Get a list of all projects"
+    response_model=ProjectPage,
+    summary="Get projects",
+    description="Get a page of projects, optionally filtered by coefficient, price and creation date"
 )
-async def get_projects():
-    return await ProjectCRUD.get_projects()
+async def get_projects(params: Annotated[ProjectListParams, Query()]):
+    try:
+        return await ProjectCRUD.get_projects(params)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get(
+    "/export",
+    summary="Export projects",
+    description="Stream all projects with their prices as NDJSON or CSV, optionally filtered"
+)
+async def export_projects(params: Annotated[ProjectExportParams, Query()]):
+    # The stream outlives the request's unit of work, so it gets a session of its own from the start
+    with no_unit_of_work():
+        batches = await start_batches(ProjectCRUD.stream_projects(params))
+    return StreamingResponse(
+        encode_rows("projects", EXPORT_COLUMNS, batches, params.format),
+        media_type=MEDIA_TYPES[params.format],
+        headers={"Content-Disposition": f'attachment; filename="projects.{params.format}"'},
+    )
 
 
 @router.get(
     "/{project_id}",
     response_model=ProjectResponse,
     summary="Get project by ID",
-    description="Get a specific project by its ID"
+    description="Get a specific project by its ID. Sends an ETag; a matching If-None-Match gets 304 "
+                "without reading the project."
 )
-async def get_project_by_id(project_id: int):
+async def get_project_by_id(project_id: int, response: Response, if_none_match: Optional[str] = Header(None)):
+    if if_none_match:
+        versions = await ProjectCRUD.get_project_versions(project_id)
+        if versions is not None and etag_matches(if_none_match, project_etag(project_id, versions)):
+            return not_modified(project_etag(project_id, versions))
+
     result = await ProjectCRUD.get_project_by_id(project_id)
 
     if result is None:
@@ -51,6 +84,8 @@ async def get_project_by_id(project_id: int):
             detail="Project not found"
         )
 
+    # From the row actually read: a lagging replica must not get a newer ETag than its body
+    response.headers["ETag"] = project_etag(project_id, result.model_dump())
     return result
 
 
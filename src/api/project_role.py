@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, status
+from typing import Dict, List, Literal, Optional
 
+from src.repositories.project import ProjectCRUD
 from src.repositories.project_role import ProjectRoleCRUD
-from src.schemas.project_role import ProjectRoleCreate, ProjectRoleUpdate, ProjectRoleResponse
+from src.schemas.project_role import (ProjectRoleCreate, ProjectRoleUpdate, ProjectRoleResponse,
+                                     ProjectRoleImportResponse)
+from src.services.etag import etag_matches, not_modified, project_roles_etag
+from src.services.project_role_import import parse_project_roles
 
 router = APIRouter(prefix="/project-roles", tags=["Project Roles"])
 
@@ -17,6 +21,11 @@ router = APIRouter(prefix="/project-roles", tags=["Project Roles"])
 async def create_project_role(project_role: ProjectRoleCreate):
     result = await ProjectRoleCRUD.create_project_role(project_role)
 
+    if isinstance(result, dict) and result.get("conflict"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=result["comment"]
+        )
     if isinstance(result, dict) and not result.get("ok", True):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -26,14 +35,55 @@ async def create_project_role(project_role: ProjectRoleCreate):
     return result
 
 
+@router.post(
+    "/import",
+    response_model=ProjectRoleImportResponse,
+    summary="Import project roles",
+    description="Create or overwrite many project role assignments from a CSV (with header) or NDJSON body. "
+                "Rows are matched on (project_id, role_id); invalid rows are reported and skipped."
+)
+async def import_project_roles(request: Request, format: Literal["csv", "ndjson"] = Query("csv")):
+    try:
+        rows, errors = parse_project_roles(await request.body(), format)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return await ProjectRoleCRUD.import_project_roles(rows, errors)
+
+
 @router.get(
     "/project/{project_id}",
     response_model=List[ProjectRoleResponse],
     summary="Get project roles by project ID",
-    description="Get all role assignments for a specific project"
+    description="Get all role assignments for a specific project. Sends an ETag; a matching If-None-Match "
+                "gets 304 from a cached version lookup."
+)
+async def get_project_roles_by_project_id(project_id: int, if_none_match: Optional[str] = Header(None)):
+    # Versions before the body: if a write lands in between, the ETag is older than the body, never newer
+    versions = await ProjectCRUD.get_project_versions(project_id)
+    headers = {}
+    if versions is not None:
+        etag = project_roles_etag(project_id, versions)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        headers["ETag"] = etag
+
+    # Cached JSON is already the response body: skip model rebuild and re-validation
+    body = await ProjectRoleCRUD.get_project_roles_json_by_project_id(project_id)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get(
+    "/projects/",
+    response_model=Dict[int, List[ProjectRoleResponse]],
+    summary="Get project roles for several projects",
+    description="Get role assignments for many projects at once, keyed by project ID"
 )
-async def get_project_roles_by_project_id(project_id: int):
-    return await ProjectRoleCRUD.get_project_roles_by_project_id(project_id)
+async def get_project_roles_by_project_ids(project_id: List[int] = Query(..., max_length=1000)):
+    return await ProjectRoleCRUD.get_project_roles_by_project_ids(project_id)
 
 
 @router.get(
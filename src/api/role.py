@@ -1,8 +1,8 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
 from typing import List
 
 from src.repositories.role import RoleCRUD
-from src.schemas.role import RoleCreate, RoleUpdate, RoleResponse
+from src.schemas.role import RoleCreate, RoleUpdate, RoleResponse, RoleUpdateResponse
 
 router = APIRouter(prefix="/roles", tags=["Roles"])
 
@@ -51,14 +51,15 @@ async def get_role_by_id(role_id: int):
     description="Get a list of all roles"
 )
 async def get_roles():
-    return await RoleCRUD.get_roles()
+    # Cached JSON is already the response body: skip model rebuild and re-validation
+    return Response(content=await RoleCRUD.get_roles_json(), media_type="application/json")
 
 
 @router.put(
     "/{role_id}",
-    response_model=RoleResponse,
+    response_model=RoleUpdateResponse,
     summary="Update role",
-    description="Update an existing role"
+    description="Update an existing role; projects relying on its default rate are repriced in the same transaction"
 )
 async def update_role(role_id: int, role_update: RoleUpdate):
     result = await RoleCRUD.update_role(role_id, role_update)
@@ -0,0 +1,42 @@
+"""Bulk-import project role assignments from a CSV or NDJSON file.
+
+    python -m src.cli.import_project_roles roles.csv
+    python -m src.cli.import_project_roles roles.ndjson --format ndjson
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from src.db.database import async_engine, unit_of_work
+from src.repositories.project_role import ProjectRoleCRUD
+from src.services.project_role_import import parse_project_roles, IMPORT_FORMATS
+
+
+async def run(path: Path, fmt: str) -> int:
+    rows, errors = parse_project_roles(path.read_bytes(), fmt)
+    try:
+        async with unit_of_work():
+            result = await ProjectRoleCRUD.import_project_roles(rows, errors)
+    finally:
+        await async_engine.dispose()
+
+    print(result.model_dump_json(indent=2))
+    return 1 if result.failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import project role assignments")
+    parser.add_argument("path", type=Path, help="CSV (with header) or NDJSON file")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="defaults to the file extension")
+    args = parser.parse_args()
+
+    fmt = args.format or ("ndjson" if args.path.suffix in (".ndjson", ".jsonl") else "csv")
+    try:
+        sys.exit(asyncio.run(run(args.path, fmt)))
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
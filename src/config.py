@@ -0,0 +1,136 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class DBSettings(BaseSettings):
+    DB_HOST: str
+    DB_PORT: int
+    DB_USER: str
+    DB_PASS: str
+    DB_NAME: str
+
+    # Engine and pool profile
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg prepared-statement cache; set to 0 behind pgbouncer in transaction mode
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_JIT: bool = False
+
+    # SQL logging: statements slower than DB_SLOW_QUERY_MS are logged as warnings,
+    # and a DB_LOG_SAMPLE_RATE fraction of all statements is logged at INFO
+    DB_SLOW_QUERY_MS: float = 200.0
+    DB_LOG_SAMPLE_RATE: float = 0.0
+
+    # Optional read replica for GET-only repository methods
+    DB_REPLICA_HOST: str | None = None
+    DB_REPLICA_PORT: int | None = None
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_CHECK_INTERVAL: float = 2.0
+    # After a write, the same client reads from the primary for this long
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    @property
+    def DATABASE_URL_asyncpg(self):
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
+    @property
+    def DATABASE_URL_psycopg(self):
+        return f"postgresql+psycopg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
+    @property
+    def DATABASE_REPLICA_URL_asyncpg(self):
+        if not self.DB_REPLICA_HOST:
+            return None
+        port = self.DB_REPLICA_PORT or self.DB_PORT
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_REPLICA_HOST}:{port}/{self.DB_NAME}"
+
+    model_config = SettingsConfigDict(env_file="src/env/.env.db", extra="ignore")
+
+
+class CacheSettings(BaseSettings):
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+
+    # Invalidation moves a namespace to a new generation, so entries can live long without going stale
+    CACHE_TTL: int = 3600
+    # After CACHE_TTL an entry is kept this much longer and served stale while one caller refreshes it
+    CACHE_STALE_TTL: int = 300
+    CACHE_REFRESH_LOCK_MS: int = 10000
+    # CACHE_TTL is spread by +-this fraction per key, so entries filled together do not expire together
+    CACHE_TTL_JITTER: float = 0.1
+    CACHE_ROLES_TTL_JITTER: float = 0.1
+    CACHE_PROJECT_ROLES_TTL_JITTER: float = 0.2
+    CACHE_PROJECT_ROLE_TTL_JITTER: float = 0.2
+    CACHE_GENERATION_TTL: int = 86400
+    CACHE_ROLES_NAMESPACE: str = "roles"
+    CACHE_PROJECT_NAMESPACE_PREFIX: str = "project:"
+    CACHE_PROJECT_ROLE_NAMESPACE_PREFIX: str = "project_role:"
+    CACHE_PRICING_RULES_NAMESPACE: str = "pricing_rules"
+
+    # Value encoding: "orjson", "json" or "msgpack" (needs the msgpack package)
+    CACHE_CODEC: str = "orjson"
+    # zlib-compress encoded values at least this large; 0 disables compression
+    CACHE_COMPRESS_MIN_BYTES: int = 0
+
+    # In-process tier in front of Redis, kept coherent through pub/sub
+    CACHE_L1_ENABLED: bool = True
+    CACHE_L1_MAX_SIZE: int = 1024
+    CACHE_L1_TTL: int = 30
+    CACHE_INVALIDATION_CHANNEL: str = "cache:invalidate"
+
+    # Cross-instance single-flight: only the lock holder reloads a missed key
+    CACHE_LOCK_ENABLED: bool = False
+    CACHE_LOCK_TIMEOUT_MS: int = 5000
+    CACHE_LOCK_WAIT_MS: int = 2000
+    CACHE_LOCK_POLL_MS: int = 50
+
+    model_config = SettingsConfigDict(env_file="src/env/.env.db", extra="ignore")
+
+
+class PricingSettings(BaseSettings):
+    # Serve the calculator GET from projects.total_price, which every team and project write keeps current
+    PRICING_INCREMENTAL: bool = False
+
+    # Buffer prices computed by the calculator GET and write them in batches
+    PRICE_WRITE_BEHIND: bool = True
+    PRICE_FLUSH_INTERVAL: float = 1.0
+    PRICE_FLUSH_MAX_PENDING: int = 500
+    # Flush attempts on shutdown before falling back to writing prices one by one
+    PRICE_FLUSH_FINAL_ATTEMPTS: int = 3
+
+    model_config = SettingsConfigDict(env_file="src/env/.env.db", extra="ignore")
+
+
+class ProfilerSettings(BaseSettings):
+    # Per-request query/Redis counting: Server-Timing header and N+1 detection
+    PROFILER_ENABLED: bool = True
+    # Warn when one statement shape runs more often than this within a request
+    PROFILER_REPEAT_THRESHOLD: int = 10
+    # Fail such requests with a 500, rolling back their writes, meant for test runs
+    PROFILER_STRICT: bool = False
+
+    model_config = SettingsConfigDict(env_file="src/env/.env.db", extra="ignore")
+
+
+class WarmupSettings(BaseSettings):
+    # Filled before /monitoring/ready passes, so a new instance does not serve from cold pools and caches
+    WARMUP_ENABLED: bool = True
+    # Connections opened up front; None fills the pool to DB_POOL_SIZE
+    WARMUP_DB_CONNECTIONS: int | None = None
+    WARMUP_REDIS_CONNECTIONS: int = 10
+    # Team lists of this many recently priced projects are cached at startup
+    WARMUP_RECENT_PROJECTS: int = 100
+    WARMUP_RETRY_INTERVAL: float = 2.0
+
+    model_config = SettingsConfigDict(env_file="src/env/.env.db", extra="ignore")
+
+
+db_settings = DBSettings()
+cache_settings = CacheSettings()
+pricing_settings = PricingSettings()
+profiler_settings = ProfilerSettings()
+warmup_settings = WarmupSettings()
@@ -1,18 +1,290 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+from fastapi import Request, Response
+from sqlalchemy import event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.config import db_settings
+from src.services.metrics import DB_QUERY_DURATION, repository_method
+from src.services.profiler import check_repeated_statements, record_query
 
 DATABASE_URL = db_settings.DATABASE_URL_asyncpg
 
-async_engine = create_async_engine(DATABASE_URL, echo=True)
+sql_logger = logging.getLogger("src.db.sql")
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.waits += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+
+def _log_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop("query_started")
+    DB_QUERY_DURATION.labels(repository_method.get()).observe(elapsed)
+    record_query(statement, elapsed)
+    elapsed_ms = elapsed * 1000
+    if elapsed_ms >= db_settings.DB_SLOW_QUERY_MS:
+        sql_logger.warning("Slow query (%.1f ms): %s", elapsed_ms, statement)
+    elif db_settings.DB_LOG_SAMPLE_RATE and random.random() < db_settings.DB_LOG_SAMPLE_RATE:
+        sql_logger.info("Query (%.1f ms): %s", elapsed_ms, statement)
+
+
+def create_engine(url: str):
+    engine = create_async_engine(
+        url,
+        echo=db_settings.DB_ECHO,
+        poolclass=InstrumentedQueuePool,
+        pool_size=db_settings.DB_POOL_SIZE,
+        max_overflow=db_settings.DB_MAX_OVERFLOW,
+        pool_timeout=db_settings.DB_POOL_TIMEOUT,
+        pool_recycle=db_settings.DB_POOL_RECYCLE,
+        pool_pre_ping=db_settings.DB_POOL_PRE_PING,
+        connect_args={
+            "statement_cache_size": db_settings.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": {"jit": "on" if db_settings.DB_JIT else "off"},
+        },
+    )
+    event.listen(engine.sync_engine, "before_cursor_execute", _start_query_timer)
+    event.listen(engine.sync_engine, "after_cursor_execute", _log_query)
+    return engine
+
+
+async_engine = create_engine(DATABASE_URL)
 new_async_session = async_sessionmaker(async_engine, expire_on_commit=False)
 
+if db_settings.DATABASE_REPLICA_URL_asyncpg:
+    replica_engine = create_engine(db_settings.DATABASE_REPLICA_URL_asyncpg)
+    new_replica_session = async_sessionmaker(replica_engine, expire_on_commit=False)
+else:
+    replica_engine = None
+    new_replica_session = None
+
+
+def _pool_stats(engine) -> dict:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "max_overflow": db_settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "waits": pool.waits,
+        "wait_seconds_avg": pool.wait_seconds_total / pool.waits if pool.waits else 0.0,
+        "wait_seconds_max": pool.wait_seconds_max,
+        "timeouts": pool.timeouts,
+    }
+
+
+def get_pool_stats() -> dict:
+    stats = {"primary": _pool_stats(async_engine)}
+    if replica_engine is not None:
+        stats["replica"] = {
+            **_pool_stats(replica_engine),
+            "usable": replica_monitor.usable,
+            "lag_seconds": replica_monitor.lag_seconds,
+        }
+    return stats
+
+
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaMonitor:
+    """Tracks whether the replica is reachable and close enough to the primary to serve reads."""
+
+    def __init__(self):
+        self.usable = False
+        self.lag_seconds: float | None = None
+
+    async def check(self):
+        try:
+            async with replica_engine.connect() as conn:
+                lag = (await conn.execute(REPLICA_LAG_QUERY)).scalar()
+        except Exception as e:
+            if self.usable:
+                logging.error(f"Read replica unavailable, reading from primary: {e}")
+            self.usable = False
+            self.lag_seconds = None
+            return
+        self.lag_seconds = float(lag or 0)
+        usable = self.lag_seconds <= db_settings.DB_REPLICA_MAX_LAG_SECONDS
+        if self.usable and not usable:
+            logging.warning(f"Read replica lags {self.lag_seconds:.1f}s, reading from primary")
+        self.usable = usable
+
+    async def run(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(db_settings.DB_REPLICA_CHECK_INTERVAL)
+
+
+replica_monitor = ReplicaMonitor()
 
-async def get_session():
+
+READ_YOUR_WRITES_COOKIE = "read_primary_until"
+
+
+class UnitOfWork:
+    """One session and one transaction shared by every repository call of a request."""
+
+    def __init__(self, session: AsyncSession, response: Response | None = None, prefer_primary: bool = False):
+        self.session = session
+        self.response = response
+        self.prefer_primary = prefer_primary
+        self.wrote = False
+        self.after_commit_callbacks = []
+
+    def mark_write(self):
+        self.wrote = True
+        if self.response is not None and replica_engine is not None:
+            # Route this client's reads to the primary until the replica has surely caught up
+            primary_until = time.time() + db_settings.DB_READ_YOUR_WRITES_SECONDS
+            self.response.set_cookie(
+                READ_YOUR_WRITES_COOKIE, f"{primary_until:.3f}",
+                max_age=int(db_settings.DB_READ_YOUR_WRITES_SECONDS) + 1, httponly=True,
+            )
+
+
+_unit_of_work: ContextVar[UnitOfWork | None] = ContextVar("unit_of_work", default=None)
+
+
+@asynccontextmanager
+async def unit_of_work(response: Response | None = None, prefer_primary: bool = False):
+    uow = UnitOfWork(new_async_session(), response, prefer_primary)
+    token = _unit_of_work.set(uow)
+    try:
+        yield uow
+        check_repeated_statements()
+        await uow.session.commit()
+    except BaseException:
+        await uow.session.rollback()
+        raise
+    finally:
+        _unit_of_work.reset(token)
+        await uow.session.close()
+
+    for callback, args in uow.after_commit_callbacks:
+        await callback(*args)
+
+
+@contextmanager
+def no_unit_of_work():
+    """Detach from the current request's unit of work, e.g. in tasks that outlive it."""
+    token = _unit_of_work.set(None)
+    try:
+        yield
+    finally:
+        _unit_of_work.reset(token)
+
+
+@asynccontextmanager
+async def session_scope():
+    """The request's unit-of-work session if there is one, otherwise a session of our own."""
+    uow = _unit_of_work.get()
+    if uow is not None:
+        yield uow.session
+        return
     async with new_async_session() as session:
         yield session
 
 
+@asynccontextmanager
+async def read_session_scope():
+    """Session for GET-only repository methods: the read replica when it can serve this request.
+
+    Falls back to session_scope() when no replica is configured, it lags or is down,
+    or the client wrote recently (or in this very request) and must read its own writes.
+    """
+    uow = _unit_of_work.get()
+    if (
+        new_replica_session is None
+        or not replica_monitor.usable
+        or (uow is not None and (uow.prefer_primary or uow.wrote))
+    ):
+        async with session_scope() as session:
+            yield session
+        return
+
+    async with new_replica_session() as session:
+        try:
+            await session.connection()
+        except Exception as e:
+            logging.error(f"Read replica connection failed, reading from primary: {e}")
+            replica_monitor.usable = False
+            session = None
+        if session is not None:
+            yield session
+            return
+    async with session_scope() as session:
+        yield session
+
+
+async def commit(session: AsyncSession):
+    # Inside a unit of work the transaction is committed once, when the request ends
+    uow = _unit_of_work.get()
+    if uow is not None and uow.session is session:
+        uow.mark_write()
+        await session.flush()
+    else:
+        await session.commit()
+
+
+async def after_commit(callback, *args):
+    """Run `await callback(*args)` once the data is committed: now, or at the end of the unit of work."""
+    uow = _unit_of_work.get()
+    if uow is not None:
+        uow.after_commit_callbacks.append((callback, args))
+    else:
+        await callback(*args)
+
+
+async def get_session(request: Request, response: Response):
+    try:
+        prefer_primary = float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        prefer_primary = False
+    async with unit_of_work(response, prefer_primary) as uow:
+        yield uow.session
+
+
 class Base(DeclarativeBase):
-    pass
\ No newline at end of file
+    pass
@@ -1,6 +1,7 @@
 import datetime
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Float
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, Float, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.db.database import  Base
@@ -11,7 +12,21 @@ class ProjectModel(Base):
     name: Mapped[str] = mapped_column(String(255))
     coefficient: Mapped[float] = mapped_column(Float(precision=2))
     total_price: Mapped[int] = mapped_column(nullable=True, default=0)
+    base_cost: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    rush: Mapped[bool] = mapped_column(default=False, server_default="false")
+    # Bumped by every write to the row / to the project's team; ETags are built from them
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
+    roles_version: Mapped[int] = mapped_column(default=1, server_default="1")
     created_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.now)
+    # When the calculator last stored a new price for the project
+    priced_at: Mapped[datetime.datetime | None] = mapped_column(nullable=True)
+
+    __table_args__ = (
+        Index("ix_projects_created_at_id", "created_at", "id"),
+        Index("ix_projects_coefficient", "coefficient"),
+        Index("ix_projects_total_price", "total_price"),
+        Index("ix_projects_priced_at", "priced_at"),
+    )
 
 class RoleModel(Base):
     __tablename__ = "roles"
@@ -26,3 +41,18 @@ class ProjectRoleModel(Base):
     role_id: Mapped[int] = mapped_column(ForeignKey("roles.id"))
     custom_rate: Mapped[int] = mapped_column(nullable=True)
     count: Mapped[int] = mapped_column(default=0)
+
+    __table_args__ = (
+        Index(
+            "uq_project_roles_project_id_role_id", "project_id", "role_id",
+            unique=True, postgresql_include=["id", "count", "custom_rate"],
+        ),
+        Index("ix_project_roles_role_id", "role_id"),
+    )
+
+class PricingRuleSetModel(Base):
+    __tablename__ = "pricing_rule_sets"
+    version: Mapped[int] = mapped_column(primary_key=True)
+    rules: Mapped[dict] = mapped_column(JSON().with_variant(JSONB(), "postgresql"))
+    comment: Mapped[str] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.now)
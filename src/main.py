@@ -1,12 +1,43 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 
 from src.api.__init__ import main_router
+from src.db.database import async_engine, get_session, replica_engine, replica_monitor
+from src.services.cache import close_cache, run_invalidation_listener
+from src.services.metrics import MetricsMiddleware
+from src.services.price_writer import price_writer
+from src.services.profiler import ProfilerMiddleware
+from src.services.warmup import warmup
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background_tasks = [asyncio.create_task(run_invalidation_listener())]
+    if replica_engine is not None:
+        await replica_monitor.check()
+        background_tasks.append(asyncio.create_task(replica_monitor.run()))
+    price_writer.start()
+    warmup.start()
+    yield
+    await warmup.stop()
+    # Buffered prices still need the database, so the pools close last
+    await price_writer.stop()
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await close_cache()
+    await async_engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
 
 
-app = FastAPI()
+# Every request runs in one unit of work: a single session, connection and transaction
+app = FastAPI(lifespan=lifespan, dependencies=[Depends(get_session)])
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.include_router(main_router)
 
 if __name__ == '__main__':
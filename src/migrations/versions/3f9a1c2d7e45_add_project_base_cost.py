@@ -0,0 +1,45 @@
+"""Add projects.base_cost for incremental pricing
+
+Revision ID: 3f9a1c2d7e45
+Revises: 50c1b0accb88
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c2d7e45'
+down_revision: Union[str, None] = '50c1b0accb88'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('projects', sa.Column('base_cost', sa.BigInteger(), server_default='0', nullable=False))
+    op.execute(
+        """
+        UPDATE projects
+        SET base_cost = team.base_cost,
+            -- total_price_expression: calculate_cost capped at MAX_TOTAL_PRICE, truncated to the column
+            total_price = TRUNC(LEAST(team.base_cost::double precision * projects.coefficient::double precision,
+                                      2000000000))::integer
+        FROM (
+            SELECT project_roles.project_id,
+                   SUM(project_roles.count::bigint * COALESCE(project_roles.custom_rate, roles.default_rate)) AS base_cost
+            FROM project_roles
+            JOIN roles ON roles.id = project_roles.role_id
+            GROUP BY project_roles.project_id
+        ) AS team
+        WHERE projects.id = team.project_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('projects', 'base_cost')
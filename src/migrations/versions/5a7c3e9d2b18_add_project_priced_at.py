@@ -0,0 +1,33 @@
+"""Add projects.priced_at
+
+Revision ID: 5a7c3e9d2b18
+Revises: e4b7d2a9c6f1
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a7c3e9d2b18'
+down_revision: Union[str, None] = 'e4b7d2a9c6f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable without a default: adding it does not rewrite the table. Existing rows stay NULL until priced.
+    op.add_column('projects', sa.Column('priced_at', sa.DateTime(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index('ix_projects_priced_at', 'projects', ['priced_at'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_projects_priced_at', table_name='projects', postgresql_concurrently=True)
+    op.drop_column('projects', 'priced_at')
@@ -0,0 +1,34 @@
+"""Add indexes for keyset pagination and filtering of projects
+
+Revision ID: 7c4e2b9a1f03
+Revises: 3f9a1c2d7e45
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4e2b9a1f03'
+down_revision: Union[str, None] = '3f9a1c2d7e45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps the table writable while the indexes build; it cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_projects_created_at_id', 'projects', ['created_at', 'id'], postgresql_concurrently=True)
+        op.create_index('ix_projects_coefficient', 'projects', ['coefficient'], postgresql_concurrently=True)
+        op.create_index('ix_projects_total_price', 'projects', ['total_price'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_projects_total_price', table_name='projects', postgresql_concurrently=True)
+        op.drop_index('ix_projects_coefficient', table_name='projects', postgresql_concurrently=True)
+        op.drop_index('ix_projects_created_at_id', table_name='projects', postgresql_concurrently=True)
@@ -0,0 +1,54 @@
+"""Index project_roles by project and role; one assignment per (project_id, role_id)
+
+Revision ID: 9d1f6a3b8c27
+Revises: 7c4e2b9a1f03
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d1f6a3b8c27'
+down_revision: Union[str, None] = '7c4e2b9a1f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    duplicates = op.get_bind().execute(sa.text(
+        """
+        SELECT count(*) FROM (
+            SELECT 1 FROM project_roles GROUP BY project_id, role_id HAVING count(*) > 1
+        ) AS duplicated
+        """
+    )).scalar()
+    if duplicates:
+        # Which row should win (and what it does to the price) is a business decision, not ours
+        raise RuntimeError(
+            f"{duplicates} (project_id, role_id) pairs have more than one project_roles row; "
+            f"merge them before applying this revision"
+        )
+
+    # CONCURRENTLY keeps the table writable while the indexes build; it cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        # Serves lookups by project_id as an index-only scan and enforces one row per pair
+        op.create_index(
+            'uq_project_roles_project_id_role_id', 'project_roles', ['project_id', 'role_id'],
+            unique=True, postgresql_include=['id', 'count', 'custom_rate'], postgresql_concurrently=True,
+        )
+        # Role deletes (FK check) and default-rate repricing look rows up by role_id
+        op.create_index('ix_project_roles_role_id', 'project_roles', ['role_id'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_project_roles_role_id', table_name='project_roles', postgresql_concurrently=True)
+        op.drop_index(
+            'uq_project_roles_project_id_role_id', table_name='project_roles', postgresql_concurrently=True
+        )
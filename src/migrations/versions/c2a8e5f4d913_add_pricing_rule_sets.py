@@ -0,0 +1,37 @@
+"""Add versioned pricing rule sets and projects.rush
+
+Revision ID: c2a8e5f4d913
+Revises: 9d1f6a3b8c27
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2a8e5f4d913'
+down_revision: Union[str, None] = '9d1f6a3b8c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('pricing_rule_sets',
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('rules', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('comment', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('version')
+    )
+    op.add_column('projects', sa.Column('rush', sa.Boolean(), server_default='false', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('projects', 'rush')
+    op.drop_table('pricing_rule_sets')
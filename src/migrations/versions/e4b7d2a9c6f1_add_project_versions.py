@@ -0,0 +1,30 @@
+"""Add projects.version and projects.roles_version
+
+Revision ID: e4b7d2a9c6f1
+Revises: c2a8e5f4d913
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7d2a9c6f1'
+down_revision: Union[str, None] = 'c2a8e5f4d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('projects', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('projects', sa.Column('roles_version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('projects', 'roles_version')
+    op.drop_column('projects', 'version')
@@ -0,0 +1,53 @@
+from sqlalchemy import select
+from src.db.models import PricingRuleSetModel
+from src.services.cache import get_or_load_current_pricing_rules, invalidate_current_pricing_rules_cache
+from src.db.database import session_scope, read_session_scope, commit, after_commit
+from src.schemas.pricing_rule import PricingRuleSetCreate, PricingRuleSetResponse
+from src.services.metrics import instrument_repository
+
+# Version reported while no rule set exists: prices follow the plain coefficient formula
+DEFAULT_PRICING_VERSION = 0
+
+
+@instrument_repository
+class PricingRuleCRUD:
+    @staticmethod
+    async def create_rule_set(rule_set: PricingRuleSetCreate) -> PricingRuleSetResponse:
+        # Rule sets are never edited: every change is a new version, and the newest one is in force
+        async with session_scope() as session:
+            new_rule_set = PricingRuleSetModel(rules=rule_set.rules.model_dump(), comment=rule_set.comment)
+            session.add(new_rule_set)
+            await commit(session)
+            await session.refresh(new_rule_set)
+            await after_commit(invalidate_current_pricing_rules_cache)
+            return PricingRuleSetResponse.model_validate(new_rule_set)
+
+    @staticmethod
+    async def get_rule_sets() -> list[PricingRuleSetResponse]:
+        async with read_session_scope() as session:
+            query = select(PricingRuleSetModel).order_by(PricingRuleSetModel.version.desc())
+            result = await session.execute(query)
+            return [PricingRuleSetResponse.model_validate(rule_set) for rule_set in result.scalars().all()]
+
+    @staticmethod
+    async def get_rule_set(version: int) -> PricingRuleSetResponse | None:
+        async with read_session_scope() as session:
+            rule_set = await session.get(PricingRuleSetModel, version)
+            if rule_set:
+                return PricingRuleSetResponse.model_validate(rule_set)
+            return None
+
+    @staticmethod
+    async def get_current_rule_set() -> dict:
+        """{"version", "rules"} of the rule set in force; version 0 with no rules when none exists."""
+        return await get_or_load_current_pricing_rules(PricingRuleCRUD._load_current_rule_set)
+
+    @staticmethod
+    async def _load_current_rule_set() -> dict:
+        async with session_scope() as session:
+            query = select(PricingRuleSetModel).order_by(PricingRuleSetModel.version.desc()).limit(1)
+            result = await session.execute(query)
+            rule_set = result.scalar_one_or_none()
+            if rule_set is None:
+                return {"version": DEFAULT_PRICING_VERSION, "rules": {}}
+            return {"version": rule_set.version, "rules": rule_set.rules}
@@ -1,23 +1,92 @@
-from sqlalchemy import select
+import base64
+import json
+from datetime import datetime
+from typing import AsyncIterator
 
-from src.db.models import ProjectModel
-from src.db.database import new_async_session
-from src.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse
+from sqlalchemy import select, update, func, cast, exists, tuple_, bindparam, BigInteger, Double, Integer
 
+from src.db.models import ProjectModel, ProjectRoleModel, RoleModel
+from src.db.database import session_scope, read_session_scope, commit, after_commit
+from src.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse, ProjectListParams, ProjectPage, ProjectFilterParams
+from src.schemas.calculator import ProjectPricingSnapshot, TeamRole, ProjectBatchCalculateRequest
+from src.services.calculator import MAX_TOTAL_PRICE
+from src.services.cache import get_or_load_project_versions, invalidate_project_cache_many
+from src.services.metrics import instrument_repository
+from src.services.pricing_rules import PricingPlan, current_pricing_plan
 
+
+def total_price_expression(base_cost):
+    # calculate_cost + cap_total_price in SQL: double precision product, capped,
+    # then truncated the way the integer column stores the Python float
+    total = cast(base_cost, Double) * cast(ProjectModel.coefficient, Double)
+    return cast(func.trunc(func.least(total, MAX_TOTAL_PRICE)), Integer)
+
+
+# projects.id is an INTEGER column
+MAX_CURSOR_ID = 2 ** 31 - 1
+
+# Projects priced per round trip when a new rule set reprices all of them
+REPRICE_BATCH_SIZE = 5000
+
+EXPORT_COLUMNS = ("id", "name", "coefficient", "total_price", "created_at")
+EXPORT_BATCH_SIZE = 1000
+
+
+def project_filters(params: ProjectFilterParams) -> list:
+    conditions = []
+    if params.min_coefficient is not None:
+        conditions.append(ProjectModel.coefficient >= params.min_coefficient)
+    if params.max_coefficient is not None:
+        conditions.append(ProjectModel.coefficient <= params.max_coefficient)
+    if params.min_price is not None:
+        conditions.append(ProjectModel.total_price >= params.min_price)
+    if params.max_price is not None:
+        conditions.append(ProjectModel.total_price <= params.max_price)
+    if params.created_from is not None:
+        conditions.append(ProjectModel.created_at >= params.created_from)
+    if params.created_to is not None:
+        conditions.append(ProjectModel.created_at < params.created_to)
+    return conditions
+
+
+def encode_cursor(order_by: str, project: ProjectModel) -> str:
+    position = {"order_by": order_by, "id": project.id}
+    if order_by == "created_at":
+        position["created_at"] = project.created_at.isoformat()
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor: str, order_by: str) -> dict:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if position["order_by"] != order_by:
+            raise ValueError("cursor was issued for a different order_by")
+        # Anything the column types would reject must fail here, as a 400, not in SQL
+        if type(position["id"]) is not int or not 0 <= position["id"] <= MAX_CURSOR_ID:
+            raise ValueError("cursor id must be an integer column value")
+        if order_by == "created_at":
+            position["created_at"] = datetime.fromisoformat(position["created_at"])
+            if position["created_at"].tzinfo is not None:
+                raise ValueError("cursor created_at must not carry a time zone")
+        return position
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+
+
+@instrument_repository
 class ProjectCRUD:
     @staticmethod
     async def create_project(project: ProjectCreate) -> ProjectResponse:
-        async with new_async_session() as session:
-            new_project = ProjectModel(name=project.name, coefficient=project.coefficient)
+        async with session_scope() as session:
+            new_project = ProjectModel(name=project.name, coefficient=project.coefficient, rush=project.rush)
             session.add(new_project)
-            await session.commit()
+            await commit(session)
             await session.refresh(new_project)
             return ProjectResponse.model_validate(new_project)
 
     @staticmethod
     async def get_project_by_id(project_id: int) -> ProjectResponse | None:
-        async with new_async_session() as session:
+        async with read_session_scope() as session:
             query = select(ProjectModel).where(ProjectModel.id == project_id)
             result = await session.execute(query)
             project = result.scalar_one_or_none()
@@ -26,53 +95,408 @@ class ProjectCRUD:
             return None
 
     @staticmethod
-    async def get_projects() -> list[ProjectResponse]:
-        async with new_async_session() as session:
-            query = select(ProjectModel)
+    async def get_project_versions(project_id: int) -> dict | None:
+        """{"version", "roles_version"} of a project, from the cache unless they changed since last read."""
+        return await get_or_load_project_versions(
+            project_id, lambda: ProjectCRUD._load_project_versions(project_id)
+        )
+
+    @staticmethod
+    async def _load_project_versions(project_id: int) -> dict | None:
+        async with session_scope() as session:
+            query = select(ProjectModel.version, ProjectModel.roles_version).where(ProjectModel.id == project_id)
+            result = await session.execute(query)
+            row = result.one_or_none()
+            if row is None:
+                return None
+            return {"version": row.version, "roles_version": row.roles_version}
+
+    @staticmethod
+    async def get_pricing_snapshot(project_id: int, primary: bool = False) -> ProjectPricingSnapshot | None:
+        # Project, its team and the roles' default rates in one joined round trip. Pass `primary`
+        # when the price is written back: a lagging replica would overwrite it with a stale one
+        scope = session_scope if primary else read_session_scope
+        async with scope() as session:
+            query = (
+                select(
+                    ProjectModel,
+                    ProjectRoleModel.role_id,
+                    ProjectRoleModel.count,
+                    ProjectRoleModel.custom_rate,
+                    RoleModel.default_rate,
+                )
+                .outerjoin(ProjectRoleModel, ProjectRoleModel.project_id == ProjectModel.id)
+                .outerjoin(RoleModel, RoleModel.id == ProjectRoleModel.role_id)
+                .where(ProjectModel.id == project_id)
+            )
+            result = await session.execute(query)
+            rows = result.all()
+            if not rows:
+                return None
+
+            team_roles = [
+                TeamRole(role_id=role_id, count=count, rate=custom_rate if custom_rate is not None else default_rate)
+                for _, role_id, count, custom_rate, default_rate in rows
+                if default_rate is not None
+            ]
+            return ProjectPricingSnapshot(
+                project=ProjectResponse.model_validate(rows[0][0]),
+                team_roles=team_roles,
+            )
+
+    @staticmethod
+    async def get_project_price(project_id: int) -> tuple[ProjectResponse, bool] | None:
+        # Incrementally maintained price: one row read plus an existence probe
+        async with read_session_scope() as session:
+            has_roles = exists().where(ProjectRoleModel.project_id == ProjectModel.id)
+            query = select(ProjectModel, has_roles).where(ProjectModel.id == project_id)
+            result = await session.execute(query)
+            row = result.one_or_none()
+            if row is None:
+                return None
+            return ProjectResponse.model_validate(row[0]), row[1]
+
+    @staticmethod
+    async def get_pricing_rows(filters: ProjectBatchCalculateRequest) -> tuple[list, list]:
+        conditions = []
+        if filters.project_ids is not None:
+            conditions.append(ProjectModel.id.in_(filters.project_ids))
+        if filters.min_coefficient is not None:
+            conditions.append(ProjectModel.coefficient >= filters.min_coefficient)
+        if filters.max_coefficient is not None:
+            conditions.append(ProjectModel.coefficient <= filters.max_coefficient)
+        if filters.created_from is not None:
+            conditions.append(ProjectModel.created_at >= filters.created_from)
+        if filters.created_to is not None:
+            conditions.append(ProjectModel.created_at < filters.created_to)
+
+        async with session_scope() as session:
+            projects_query = (
+                select(ProjectModel.id, ProjectModel.coefficient, ProjectModel.rush)
+                .where(*conditions)
+                .order_by(ProjectModel.id)
+            )
+            projects = (await session.execute(projects_query)).all()
+
+            team_query = (
+                select(
+                    ProjectRoleModel.project_id,
+                    ProjectRoleModel.role_id,
+                    ProjectRoleModel.count,
+                    func.coalesce(ProjectRoleModel.custom_rate, RoleModel.default_rate),
+                )
+                .join(RoleModel, RoleModel.id == ProjectRoleModel.role_id)
+                .where(ProjectRoleModel.project_id.in_(select(ProjectModel.id).where(*conditions)))
+            )
+            team_rows = (await session.execute(team_query)).all()
+            return projects, team_rows
+
+    @staticmethod
+    async def get_projects(params: ProjectListParams) -> ProjectPage:
+        conditions = project_filters(params)
+
+        if params.order_by == "created_at":
+            order = (ProjectModel.created_at, ProjectModel.id)
+        else:
+            order = (ProjectModel.id,)
+        if params.cursor is not None:
+            position = decode_cursor(params.cursor, params.order_by)
+            if params.order_by == "created_at":
+                conditions.append(tuple_(*order) > tuple_(position["created_at"], position["id"]))
+            else:
+                conditions.append(ProjectModel.id > position["id"])
+
+        async with read_session_scope() as session:
+            # One extra row tells us whether there is a next page
+            query = select(ProjectModel).where(*conditions).order_by(*order).limit(params.limit + 1)
             result = await session.execute(query)
             projects = result.scalars().all()
-            return [ProjectResponse.model_validate(project) for project in projects]
+
+            next_cursor = None
+            if len(projects) > params.limit:
+                projects = projects[:params.limit]
+                next_cursor = encode_cursor(params.order_by, projects[-1])
+            return ProjectPage(
+                items=[ProjectResponse.model_validate(project) for project in projects],
+                next_cursor=next_cursor,
+            )
+
+    @staticmethod
+    async def stream_projects(params: ProjectFilterParams) -> AsyncIterator[list[tuple]]:
+        """Yield the matching projects in batches of EXPORT_COLUMNS tuples, ordered by id.
+
+        Rows come from a server-side cursor, so only one batch is held in memory.
+        Iterated by a StreamingResponse, it outlives the request's unit of work, so
+        start it outside of it (no_unit_of_work) to read through a session of its own.
+        """
+        columns = [getattr(ProjectModel, column) for column in EXPORT_COLUMNS]
+        async with read_session_scope() as session:
+            query = (
+                select(*columns)
+                .where(*project_filters(params))
+                .order_by(ProjectModel.id)
+                .execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            result = await session.stream(query)
+            async for rows in result.partitions():
+                yield [tuple(row) for row in rows]
 
     @staticmethod
     async def update_project(id: int, project_update: ProjectUpdate) -> ProjectResponse | dict:
-        async with new_async_session() as session:
+        async with session_scope() as session:
             old_project = await session.get(ProjectModel, id)
             if old_project:
                 # Обновляем только переданные поля
                 update_data = project_update.model_dump(exclude_unset=True)
                 for field, value in update_data.items():
                     setattr(old_project, field, value)
+                old_project.version = ProjectModel.version + 1
+
+                if "coefficient" in update_data or "rush" in update_data:
+                    await session.flush()
+                    plan = await current_pricing_plan()
+                    if not plan.is_default:
+                        await ProjectCRUD._write_plan_prices(session, plan, [id])
+                    elif "coefficient" in update_data:
+                        await session.execute(
+                            update(ProjectModel)
+                            .where(ProjectModel.id == id)
+                            .values(total_price=total_price_expression(ProjectModel.base_cost))
+                            .execution_options(synchronize_session=False)
+                        )
 
-                await session.commit()
+                await commit(session)
                 await session.refresh(old_project)
+                await after_commit(invalidate_project_cache_many, [id])
                 return ProjectResponse.model_validate(old_project)
             else:
                 return {"ok": False, "message": "Project not found"}
 
     @staticmethod
     async def delete_project(id: int) -> dict:
-        async with new_async_session() as session:
+        async with session_scope() as session:
             old_project = await session.get(ProjectModel, id)
             if old_project:
                 await session.delete(old_project)
-                await session.commit()
+                await commit(session)
+                await after_commit(invalidate_project_cache_many, [id])
                 return {"ok": True}
             else:
                 return {"ok": False, "message": "Project not found"}
 
     @staticmethod
-    async def set_project_price(project_id: int, total_price: int) -> bool:
-        async with new_async_session() as session:
+    async def set_project_price(project_id: int, total_price: int) -> int | None:
+        """Store a calculated price; returns the project's version after the write, None if it does not exist."""
+        async with session_scope() as session:
             project = await session.get(ProjectModel, project_id)
             if project:
-                project.total_price = total_price
-                await session.commit()
-                return True
-            return False
+                # The column is an integer, so compare what would actually be stored
+                if project.total_price != int(total_price):
+                    project.total_price = int(total_price)
+                    project.version = ProjectModel.version + 1
+                    project.priced_at = datetime.now()
+                    await commit(session)
+                    await session.refresh(project, ["version"])
+                    await after_commit(invalidate_project_cache_many, [project_id])
+                return project.version
+            return None
+
+    @staticmethod
+    async def set_project_prices(prices: dict[int, int]) -> None:
+        if not prices:
+            return
+        # Core executemany: rows whose price did not change keep their version
+        projects = ProjectModel.__table__
+        async with session_scope() as session:
+            await session.execute(
+                update(projects)
+                .where(
+                    projects.c.id == bindparam("b_id"),
+                    projects.c.total_price.is_distinct_from(bindparam("b_total_price")),
+                )
+                .values(
+                    total_price=bindparam("b_total_price"), version=projects.c.version + 1, priced_at=datetime.now()
+                ),
+                [{"b_id": project_id, "b_total_price": total_price} for project_id, total_price in prices.items()],
+            )
+            await commit(session)
+            await after_commit(invalidate_project_cache_many, list(prices))
+
+    @staticmethod
+    async def apply_team_change(session, project_id: int, delta: int = 0) -> None:
+        """Record a change to a project's team inside the caller's transaction.
+
+        Bumps roles_version and, for a non-zero `delta`, shifts the base cost (and price) by it.
+        Under pricing rules any team change can move the price, so the project is repriced
+        from its flushed team. The caller invalidates the project's cached versions once it commits.
+        """
+        plan = await current_pricing_plan()
+        values = {"roles_version": ProjectModel.roles_version + 1}
+        if delta:
+            base_cost = ProjectModel.base_cost + delta
+            values.update(base_cost=base_cost, version=ProjectModel.version + 1)
+            if plan.is_default:
+                values.update(total_price=total_price_expression(base_cost))
+        if not plan.is_default:
+            values.update(version=ProjectModel.version + 1)
+        await session.execute(
+            update(ProjectModel)
+            .where(ProjectModel.id == project_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if not plan.is_default:
+            await ProjectCRUD._write_plan_prices(session, plan, [project_id])
+
+    @staticmethod
+    async def reprice_projects(session, project_ids, team_changed: bool = False) -> list[int]:
+        """Recompute base_cost and total_price of `project_ids` (ids or a subquery) with one UPDATE ... FROM.
+
+        Runs inside the caller's transaction, so it sees whatever the caller has already
+        flushed. Bumps version, and roles_version too when `team_changed`. Prices follow the
+        rules in force. Returns the ids of the projects it updated; the caller invalidates
+        their cached versions after commit.
+        """
+        plan = await current_pricing_plan()
+        team = (
+            select(
+                ProjectRoleModel.project_id.label("project_id"),
+                func.sum(
+                    cast(ProjectRoleModel.count, BigInteger)
+                    * func.coalesce(ProjectRoleModel.custom_rate, RoleModel.default_rate)
+                ).label("base_cost"),
+            )
+            .join(RoleModel, RoleModel.id == ProjectRoleModel.role_id)
+            .where(ProjectRoleModel.project_id.in_(project_ids))
+            .group_by(ProjectRoleModel.project_id)
+            .subquery()
+        )
+        values = {"base_cost": team.c.base_cost, "version": ProjectModel.version + 1}
+        if plan.is_default:
+            values["total_price"] = total_price_expression(team.c.base_cost)
+        if team_changed:
+            values["roles_version"] = ProjectModel.roles_version + 1
+        query = (
+            update(ProjectModel)
+            # Repeating the filter on projects lets the planner reach them by primary key: the
+            # grouped team subquery's row estimate alone makes it scan the whole table
+            .where(ProjectModel.id == team.c.project_id, ProjectModel.id.in_(project_ids))
+            .values(**values)
+            .returning(ProjectModel.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(query)
+        repriced_ids = list(result.scalars().all())
+        if not plan.is_default:
+            await ProjectCRUD._write_plan_prices(session, plan, repriced_ids)
+        return repriced_ids
+
+    @staticmethod
+    async def _plan_prices(session, plan: PricingPlan, project_ids: list[int]) -> dict[int, int]:
+        """Stored prices of `project_ids` under `plan`, read from the caller's transaction; 0 without a team."""
+        projects_query = (
+            select(ProjectModel.id, ProjectModel.coefficient, ProjectModel.rush)
+            .where(ProjectModel.id.in_(project_ids))
+            .order_by(ProjectModel.id)
+        )
+        projects = (await session.execute(projects_query)).all()
+        team_query = (
+            select(
+                ProjectRoleModel.project_id,
+                ProjectRoleModel.role_id,
+                ProjectRoleModel.count,
+                func.coalesce(ProjectRoleModel.custom_rate, RoleModel.default_rate),
+            )
+            .join(RoleModel, RoleModel.id == ProjectRoleModel.role_id)
+            .where(ProjectRoleModel.project_id.in_(project_ids))
+        )
+        team_rows = (await session.execute(team_query)).all()
+        return {
+            project_id: int(total_price) if total_price is not None else 0
+            for project_id, total_price in plan.price_projects(projects, team_rows)
+        }
+
+    @staticmethod
+    async def _write_plan_prices(session, plan: PricingPlan, project_ids: list[int]) -> None:
+        # The callers have already bumped the versions of these rows
+        if not project_ids:
+            return
+        prices = await ProjectCRUD._plan_prices(session, plan, project_ids)
+        projects = ProjectModel.__table__
+        await session.execute(
+            update(projects)
+            .where(projects.c.id == bindparam("b_id"))
+            .values(total_price=bindparam("b_total_price")),
+            [{"b_id": project_id, "b_total_price": total_price} for project_id, total_price in prices.items()],
+        )
+
+    @staticmethod
+    async def reprice_all_projects(plan: PricingPlan) -> list[int]:
+        """Bring every stored price in line with `plan`, in the caller's transaction.
+
+        Run when a rule set is published, before the new version is visible to anyone.
+        Only rows whose price changes are written (and get a new version); their ids are
+        returned and their cached versions invalidated after commit.
+        """
+        async with session_scope() as session:
+            if plan.is_default:
+                total_price = total_price_expression(ProjectModel.base_cost)
+                result = await session.execute(
+                    update(ProjectModel)
+                    .where(ProjectModel.total_price.is_distinct_from(total_price))
+                    .values(total_price=total_price, version=ProjectModel.version + 1)
+                    .returning(ProjectModel.id)
+                    .execution_options(synchronize_session=False)
+                )
+                changed_ids = list(result.scalars().all())
+            else:
+                changed_ids = []
+                projects = ProjectModel.__table__
+                last_id = 0
+                while True:
+                    batch = (await session.execute(
+                        select(ProjectModel.id, ProjectModel.total_price)
+                        .where(ProjectModel.id > last_id)
+                        .order_by(ProjectModel.id)
+                        .limit(REPRICE_BATCH_SIZE)
+                    )).all()
+                    if not batch:
+                        break
+                    last_id = batch[-1].id
+                    stored = dict(batch)
+                    prices = await ProjectCRUD._plan_prices(session, plan, list(stored))
+                    changed = {
+                        project_id: total_price for project_id, total_price in prices.items()
+                        if total_price != stored[project_id]
+                    }
+                    if changed:
+                        await session.execute(
+                            update(projects)
+                            .where(projects.c.id == bindparam("b_id"))
+                            .values(total_price=bindparam("b_total_price"), version=projects.c.version + 1),
+                            [{"b_id": project_id, "b_total_price": total_price}
+                             for project_id, total_price in changed.items()],
+                        )
+                        changed_ids.extend(changed)
+            await commit(session)
+            await after_commit(invalidate_project_cache_many, changed_ids)
+            return changed_ids
+
+    @staticmethod
+    async def get_recently_priced_project_ids(limit: int) -> list[int]:
+        async with read_session_scope() as session:
+            query = (
+                select(ProjectModel.id)
+                .where(ProjectModel.priced_at.is_not(None))
+                .order_by(ProjectModel.priced_at.desc())
+                .limit(limit)
+            )
+            result = await session.execute(query)
+            return list(result.scalars().all())
 
     @staticmethod
     async def is_project(project_id: int) -> bool:
-        async with new_async_session() as session:
+        async with session_scope() as session:
             query = select(ProjectModel).filter_by(id=project_id)
             result = await session.execute(query)
             project = result.scalar_one_or_none()
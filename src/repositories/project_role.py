@@ -1,23 +1,64 @@
-from sqlalchemy import select
-
-from src.db.models import ProjectRoleModel
-from src.db.database import new_async_session
-from src.services.cache import (invalidate_project_roles_cache_by_project_id,
-                                get_cached_project_roles_by_project_id,
-                                set_cached_project_roles_by_project_id,
-                                get_cached_project_role_by_id,
-                                set_cached_project_role_by_id,
+from sqlalchemy import select, text, literal, union_all
+from sqlalchemy.exc import IntegrityError
+
+from src.db.models import ProjectModel, ProjectRoleModel, RoleModel
+from src.db.database import session_scope, commit, after_commit
+from src.services.cache import (invalidate_project_cache_many,
+                                get_or_load_project_roles_by_project_id,
+                                get_or_load_project_roles_json_by_project_id,
+                                get_or_load_project_roles_many,
+                                get_or_load_project_role_by_id,
                                 invalidate_project_role_cache_by_id,
+                                invalidate_project_role_cache_many,
                                 )
 from src.repositories.role import RoleCRUD
 from src.repositories.project import ProjectCRUD
-from src.schemas.project_role import ProjectRoleCreate, ProjectRoleUpdate, ProjectRoleResponse
+from src.schemas.project_role import (ProjectRoleCreate, ProjectRoleUpdate, ProjectRoleResponse,
+                                     ProjectRoleImportError, ProjectRoleImportResponse)
+from src.services.metrics import instrument_repository
+
+
+IMPORT_STAGING_TABLE = "project_roles_import"
+IMPORT_COLUMNS = ("project_id", "role_id", "count", "custom_rate")
+
+CREATE_IMPORT_STAGING_TABLE = text(
+    f"""
+    CREATE TEMPORARY TABLE IF NOT EXISTS {IMPORT_STAGING_TABLE} (
+        project_id integer NOT NULL,
+        role_id integer NOT NULL,
+        count integer NOT NULL,
+        custom_rate integer
+    ) ON COMMIT DROP
+    """
+)
 
+MERGE_IMPORT = text(
+    f"""
+    INSERT INTO project_roles (project_id, role_id, count, custom_rate)
+    SELECT s.project_id, s.role_id, s.count, s.custom_rate
+    FROM {IMPORT_STAGING_TABLE} AS s
+    ON CONFLICT (project_id, role_id)
+    DO UPDATE SET count = EXCLUDED.count, custom_rate = EXCLUDED.custom_rate
+    RETURNING id, xmax = 0 AS inserted
+    """
+)
 
+
+@instrument_repository
 class ProjectRoleCRUD:
+    @staticmethod
+    async def _team_cost(session, role_id: int, count: int, custom_rate: int | None) -> int:
+        # count x rate of one assignment; FOR SHARE keeps the role's rate fixed until commit
+        if custom_rate is not None:
+            return count * custom_rate
+        query = select(RoleModel.default_rate).where(RoleModel.id == role_id).with_for_update(read=True)
+        result = await session.execute(query)
+        default_rate = result.scalar_one_or_none()
+        return count * default_rate if default_rate is not None else 0
+
     @staticmethod
     async def create_project_role(project_role_data: ProjectRoleCreate):
-        async with new_async_session() as session:
+        async with session_scope() as session:
 
             if await RoleCRUD.is_role(project_role_data.role_id) and await ProjectCRUD.is_project(
                     project_role_data.project_id):
@@ -27,87 +68,195 @@ class ProjectRoleCRUD:
                     custom_rate=project_role_data.custom_rate,
                     count=project_role_data.count
                 )
-                session.add(new_project_role)
-                await session.commit()
-                await invalidate_project_roles_cache_by_project_id(project_role_data.project_id)
+                try:
+                    async with session.begin_nested():
+                        session.add(new_project_role)
+                        await session.flush()
+                except IntegrityError:
+                    return {"ok": False, "conflict": True, "comment": "Role is already assigned to this project"}
+                cost = await ProjectRoleCRUD._team_cost(
+                    session, new_project_role.role_id, new_project_role.count, new_project_role.custom_rate
+                )
+                await ProjectCRUD.apply_team_change(session, new_project_role.project_id, cost)
+                await commit(session)
+                await after_commit(invalidate_project_cache_many, [project_role_data.project_id])
                 return new_project_role
             else:
                 return {"ok": False, "comment": "Role or Project Not Found"}
 
     @staticmethod
     async def update_project_role(project_role_id: int, project_role_data: ProjectRoleUpdate):
-        async with new_async_session() as session:
-            old_project_role = await session.get(ProjectRoleModel, project_role_id)
+        async with session_scope() as session:
+            old_project_role = await session.get(ProjectRoleModel, project_role_id, with_for_update=True)
             if old_project_role:
+                old_cost = await ProjectRoleCRUD._team_cost(
+                    session, old_project_role.role_id, old_project_role.count, old_project_role.custom_rate
+                )
                 if project_role_data.custom_rate is not None:
                     old_project_role.custom_rate = project_role_data.custom_rate
                 if project_role_data.count is not None:
                     old_project_role.count = project_role_data.count
-                await session.commit()
-                await invalidate_project_roles_cache_by_project_id(old_project_role.project_id)
-                await invalidate_project_role_cache_by_id(project_role_id)
+                new_cost = await ProjectRoleCRUD._team_cost(
+                    session, old_project_role.role_id, old_project_role.count, old_project_role.custom_rate
+                )
+                await ProjectCRUD.apply_team_change(session, old_project_role.project_id, new_cost - old_cost)
+                await commit(session)
+                await after_commit(invalidate_project_cache_many, [old_project_role.project_id])
+                await after_commit(invalidate_project_role_cache_by_id, project_role_id)
                 return old_project_role
             else:
                 return {"ok": False, "message": "Project role not found"}
 
+    @staticmethod
+    async def import_project_roles(
+            rows: list[tuple[int, ProjectRoleCreate]], errors: list[ProjectRoleImportError]
+    ) -> ProjectRoleImportResponse:
+        """Insert or overwrite many assignments at once, keyed by (project_id, role_id).
+
+        `rows` and `errors` come from parse_project_roles. Rows whose project or role does not
+        exist are added to the errors; the rest are COPYed into a staging table and merged
+        into project_roles with one upsert in the caller's transaction.
+        """
+        errors = list(errors)
+        async with session_scope() as session:
+            project_ids = {project_role.project_id for _, project_role in rows}
+            role_ids = {project_role.role_id for _, project_role in rows}
+            existing = set()
+            if rows:
+                query = union_all(
+                    select(literal("project").label("kind"), ProjectModel.id).where(ProjectModel.id.in_(project_ids)),
+                    select(literal("role").label("kind"), RoleModel.id).where(RoleModel.id.in_(role_ids)),
+                )
+                result = await session.execute(query)
+                existing = {(kind, id) for kind, id in result.all()}
+
+            records = []
+            for row_number, project_role in rows:
+                if ("project", project_role.project_id) not in existing:
+                    errors.append(ProjectRoleImportError(row=row_number, message="Project not found"))
+                elif ("role", project_role.role_id) not in existing:
+                    errors.append(ProjectRoleImportError(row=row_number, message="Role not found"))
+                else:
+                    records.append(
+                        (project_role.project_id, project_role.role_id, project_role.count, project_role.custom_rate)
+                    )
+
+            updated_ids, inserted_ids, repriced_project_ids = [], [], []
+            if records:
+                await session.execute(CREATE_IMPORT_STAGING_TABLE)
+                await session.execute(text(f"TRUNCATE {IMPORT_STAGING_TABLE}"))
+                connection = await session.connection()
+                raw_connection = await connection.get_raw_connection()
+                await raw_connection.driver_connection.copy_records_to_table(
+                    IMPORT_STAGING_TABLE, records=records, columns=IMPORT_COLUMNS
+                )
+                for project_role_id, inserted in (await session.execute(MERGE_IMPORT)).all():
+                    (inserted_ids if inserted else updated_ids).append(project_role_id)
+
+                affected_project_ids = sorted({record[0] for record in records})
+                repriced_project_ids = await ProjectCRUD.reprice_projects(
+                    session, affected_project_ids, team_changed=True
+                )
+                await commit(session)
+                await after_commit(invalidate_project_cache_many, affected_project_ids)
+                await after_commit(invalidate_project_role_cache_many, updated_ids)
+
+            return ProjectRoleImportResponse(
+                inserted=len(inserted_ids),
+                updated=len(updated_ids),
+                failed=len(errors),
+                repriced_projects=len(repriced_project_ids),
+                errors=sorted(errors, key=lambda error: error.row),
+            )
+
     @staticmethod
     async def get_project_roles_by_project_id(project_id: int):
-        cached = await get_cached_project_roles_by_project_id(project_id)
-        if cached:
-            return [ProjectRoleResponse(**item) for item in cached]
+        project_roles_data = await get_or_load_project_roles_by_project_id(
+            project_id, lambda: ProjectRoleCRUD._load_project_roles_by_project_id(project_id)
+        )
+        return [ProjectRoleResponse(**item) for item in project_roles_data]
+
+    @staticmethod
+    async def get_project_roles_json_by_project_id(project_id: int) -> bytes:
+        return await get_or_load_project_roles_json_by_project_id(
+            project_id, lambda: ProjectRoleCRUD._load_project_roles_by_project_id(project_id)
+        )
 
-        async with new_async_session() as session:
+    @staticmethod
+    async def _load_project_roles_by_project_id(project_id: int) -> list[dict]:
+        async with session_scope() as session:
             query = select(ProjectRoleModel).filter_by(project_id=project_id)
             result = await session.execute(query)
             project_roles = result.scalars().all()
 
-            project_roles_data = [
+            return [
                 ProjectRoleResponse(
                     id=pr.id,
                     project_id=pr.project_id,
                     role_id=pr.role_id,
                     count=pr.count,
                     custom_rate=pr.custom_rate
-                ) for pr in project_roles
+                ).model_dump() for pr in project_roles
             ]
 
+    @staticmethod
+    async def get_project_roles_by_project_ids(project_ids: list[int]) -> dict[int, list[ProjectRoleResponse]]:
+        project_ids = list(dict.fromkeys(project_ids))
+        project_roles_data = await get_or_load_project_roles_many(
+            project_ids, ProjectRoleCRUD._load_project_roles_by_project_ids
+        )
+        return {
+            project_id: [ProjectRoleResponse(**item) for item in project_roles_data[project_id]]
+            for project_id in project_ids
+        }
 
-            project_roles_dict = [pr.model_dump() for pr in project_roles_data]
-            await set_cached_project_roles_by_project_id(project_id, project_roles_dict)
-            return project_roles_data
+    @staticmethod
+    async def _load_project_roles_by_project_ids(project_ids: list[int]) -> dict[int, list[dict]]:
+        loaded = {project_id: [] for project_id in project_ids}
+        async with session_scope() as session:
+            query = select(ProjectRoleModel).where(ProjectRoleModel.project_id.in_(project_ids))
+            result = await session.execute(query)
+            for pr in result.scalars().all():
+                loaded[pr.project_id].append(ProjectRoleResponse.model_validate(pr).model_dump())
+        return loaded
 
     @staticmethod
     async def get_project_role_by_id(project_role_id: int):
+        project_role_data = await get_or_load_project_role_by_id(
+            project_role_id, lambda: ProjectRoleCRUD._load_project_role_by_id(project_role_id)
+        )
+        if project_role_data is None:
+            return None
+        return ProjectRoleResponse(**project_role_data)
 
-        cached = await get_cached_project_role_by_id(project_role_id)
-        if cached:
-            return ProjectRoleResponse(**cached)
-
-        async with new_async_session() as session:
+    @staticmethod
+    async def _load_project_role_by_id(project_role_id: int) -> dict | None:
+        async with session_scope() as session:
             project_role = await session.get(ProjectRoleModel, project_role_id)
             if not project_role:
                 return None
 
-            project_role_response = ProjectRoleResponse(
+            return ProjectRoleResponse(
                 id=project_role.id,
                 project_id=project_role.project_id,
                 role_id=project_role.role_id,
                 count=project_role.count,
                 custom_rate=project_role.custom_rate
-            )
-
-            await set_cached_project_role_by_id(project_role_id, project_role_response.model_dump())
-            return project_role_response
+            ).model_dump()
 
     @staticmethod
     async def delete_project_role(project_role_id: int):
-        async with new_async_session() as session:
-            old_project_role = await session.get(ProjectRoleModel, project_role_id)
+        async with session_scope() as session:
+            old_project_role = await session.get(ProjectRoleModel, project_role_id, with_for_update=True)
             if old_project_role:
+                cost = await ProjectRoleCRUD._team_cost(
+                    session, old_project_role.role_id, old_project_role.count, old_project_role.custom_rate
+                )
                 await session.delete(old_project_role)
-                await session.commit()
-                await invalidate_project_roles_cache_by_project_id(old_project_role.project_id)
-                await invalidate_project_role_cache_by_id(project_role_id)
+                await ProjectCRUD.apply_team_change(session, old_project_role.project_id, -cost)
+                await commit(session)
+                await after_commit(invalidate_project_cache_many, [old_project_role.project_id])
+                await after_commit(invalidate_project_role_cache_by_id, project_role_id)
                 return {"ok": True}
             else:
                 return {"ok": False, "message": "Project role not found"}
\ No newline at end of file
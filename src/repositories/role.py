@@ -1,24 +1,28 @@
 from sqlalchemy import select
-from src.db.models import RoleModel
-from src.services.cache import get_cached_roles, set_cached_roles, invalidate_roles_cache
-from src.db.database import new_async_session
-from src.schemas.role import RoleCreate, RoleUpdate, RoleResponse
+from src.db.models import RoleModel, ProjectRoleModel
+from src.services.cache import (get_or_load_roles, get_or_load_roles_json, invalidate_roles_cache,
+                                invalidate_project_cache_many)
+from src.db.database import session_scope, read_session_scope, commit, after_commit
+from src.repositories.project import ProjectCRUD
+from src.schemas.role import RoleCreate, RoleUpdate, RoleResponse, RoleUpdateResponse
+from src.services.metrics import instrument_repository
 
 
+@instrument_repository
 class RoleCRUD:
     @staticmethod
     async def create_role(role: RoleCreate) -> RoleResponse:
-        async with new_async_session() as session:
+        async with session_scope() as session:
             new_role = RoleModel(name=role.name, default_rate=role.default_rate)
             session.add(new_role)
-            await session.commit()
+            await commit(session)
             await session.refresh(new_role)
-            await invalidate_roles_cache()
+            await after_commit(invalidate_roles_cache)
             return RoleResponse.model_validate(new_role)
 
     @staticmethod
     async def get_role_by_id(role_id: int) -> RoleResponse | None:
-        async with new_async_session() as session:
+        async with read_session_scope() as session:
             query = select(RoleModel).filter_by(id=role_id)
             result = await session.execute(query)
             role = result.scalar()
@@ -28,7 +32,7 @@ class RoleCRUD:
 
     @staticmethod
     async def is_role(role_id: int) -> bool:
-        async with new_async_session() as session:
+        async with session_scope() as session:
             query = select(RoleModel).filter_by(id=role_id)
             result = await session.execute(query)
             role = result.scalar_one_or_none()
@@ -39,45 +43,60 @@ class RoleCRUD:
 
     @staticmethod
     async def get_roles() -> list[RoleResponse]:
-        cached = await get_cached_roles()
-        if cached:
-            return [RoleResponse(**role_data) for role_data in cached]
+        roles_data = await get_or_load_roles(RoleCRUD._load_roles)
+        return [RoleResponse(**role_data) for role_data in roles_data]
 
-        async with new_async_session() as session:
+    @staticmethod
+    async def get_roles_json() -> bytes:
+        return await get_or_load_roles_json(RoleCRUD._load_roles)
+
+    @staticmethod
+    async def _load_roles() -> list[dict]:
+        async with session_scope() as session:
             query = select(RoleModel)
             result = await session.execute(query)
             roles = result.scalars().all()
-
-            roles_response = [RoleResponse.model_validate(role) for role in roles]
-            roles_data = [role.model_dump() for role in roles_response]
-            await set_cached_roles(roles_data)
-            return roles_response
+            return [RoleResponse.model_validate(role).model_dump() for role in roles]
 
     @staticmethod
-    async def update_role(id: int, role_update: RoleUpdate) -> RoleResponse | dict:
-        async with new_async_session() as session:
+    async def update_role(id: int, role_update: RoleUpdate) -> RoleUpdateResponse | dict:
+        async with session_scope() as session:
             old_role = await session.get(RoleModel, id)
             if old_role:
+                old_default_rate = old_role.default_rate
 
                 update_data = role_update.model_dump(exclude_unset=True)
                 for field, value in update_data.items():
                     setattr(old_role, field, value)
 
-                await session.commit()
+                repriced_project_ids = []
+                if old_role.default_rate != old_default_rate:
+                    await session.flush()
+                    uses_default_rate = (
+                        select(ProjectRoleModel.project_id)
+                        .where(ProjectRoleModel.role_id == id, ProjectRoleModel.custom_rate.is_(None))
+                    )
+                    repriced_project_ids = await ProjectCRUD.reprice_projects(session, uses_default_rate)
+
+                await commit(session)
                 await session.refresh(old_role)
-                await invalidate_roles_cache()
-                return RoleResponse.model_validate(old_role)
+                await after_commit(invalidate_roles_cache)
+                await after_commit(invalidate_project_cache_many, repriced_project_ids)
+                return RoleUpdateResponse(
+                    **RoleResponse.model_validate(old_role).model_dump(),
+                    repriced_projects=len(repriced_project_ids),
+                )
             else:
                 return {"ok": False, "message": "Role not found"}
 
     @staticmethod
     async def delete_role(role_id: int) -> dict:
-        async with new_async_session() as session:
+        async with session_scope() as session:
             old_role = await session.get(RoleModel, role_id)
             if old_role:
                 await session.delete(old_role)
-                await session.commit()
-                await invalidate_roles_cache()
+                await commit(session)
+                await after_commit(invalidate_roles_cache)
                 return {"ok": True}
             else:
                 return {"ok": False, "message": "Role not found"}
\ No newline at end of file
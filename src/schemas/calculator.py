@@ -0,0 +1,75 @@
+from pydantic import BaseModel, Field, confloat, conint, field_validator
+from typing import Literal, Optional
+from datetime import datetime
+
+from src.schemas.project import ProjectResponse, naive_datetime
+
+
+class TeamRole(BaseModel):
+    role_id: Optional[int] = Field(None, description="Role ID")
+    count: int = Field(..., ge=0, description="Number of people in this role")
+    rate: int = Field(..., ge=0, description="Effective hourly rate for this role")
+
+
+class ProjectPricingSnapshot(BaseModel):
+    project: ProjectResponse
+    team_roles: list[TeamRole] = Field(default_factory=list, description="Team composition with resolved rates")
+
+
+class ProjectBatchCalculateRequest(BaseModel):
+    project_ids: Optional[list[int]] = Field(None, max_length=10000, description="Projects to price; all matching projects if omitted")
+    min_coefficient: Optional[float] = Field(None, ge=0, description="Only projects with coefficient >= this value")
+    max_coefficient: Optional[float] = Field(None, ge=0, description="Only projects with coefficient <= this value")
+    created_from: Optional[datetime] = Field(None, description="Only projects created at or after this moment")
+    created_to: Optional[datetime] = Field(None, description="Only projects created before this moment")
+
+    _naive_created_bounds = field_validator("created_from", "created_to")(naive_datetime)
+
+
+class ProjectCostResult(BaseModel):
+    project_id: int
+    total_price: Optional[int | float] = None
+    detail: Optional[str] = Field(None, description="Why the project could not be priced")
+
+
+class ProjectBatchCalculateResponse(BaseModel):
+    pricing_version: int = Field(..., description="Pricing rules version the prices were calculated with")
+    results: list[ProjectCostResult]
+
+
+SCENARIO_MAX_POINTS = 100000
+# Keep every count x rate product, summed over a whole team, far inside int64
+SCENARIO_MAX_COUNT = 100000
+SCENARIO_MAX_RATE = 10000000
+SCENARIO_MAX_COEFFICIENT = 1000000
+
+
+class RoleVariation(BaseModel):
+    role_id: int = Field(..., description="A role on the project's team")
+    counts: Optional[list[conint(ge=0, le=SCENARIO_MAX_COUNT)]] = Field(
+        None, min_length=1, max_length=1000, description="Headcounts to try; current count if omitted"
+    )
+    rates: Optional[list[conint(ge=0, le=SCENARIO_MAX_RATE)]] = Field(
+        None, min_length=1, max_length=1000, description="Rates to try; current rate if omitted"
+    )
+
+
+class ProjectScenarioRequest(BaseModel):
+    roles: list[RoleVariation] = Field(default_factory=list, max_length=50, description="Per-role variations")
+    coefficients: Optional[list[confloat(ge=0, le=SCENARIO_MAX_COEFFICIENT)]] = Field(
+        None, min_length=1, max_length=1000, description="Coefficients to try; the project's if omitted"
+    )
+
+
+class ScenarioAxis(BaseModel):
+    parameter: Literal["count", "rate", "coefficient"]
+    role_id: Optional[int] = Field(None, description="Role the count or rate belongs to")
+    values: list[int | float]
+
+
+class ProjectScenarioResponse(BaseModel):
+    project_id: int
+    pricing_version: int = Field(..., description="Pricing rules version the prices were calculated with")
+    current_total_price: int | float = Field(..., description="Price of the team as it is today")
+    axes: list[ScenarioAxis] = Field(..., description="One entry per varied parameter, in the nesting order of prices")
+    prices: list | int | float = Field(..., description="Price surface: nested lists indexed like axes, a number if nothing varies")
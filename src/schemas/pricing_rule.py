@@ -0,0 +1,66 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional
+from datetime import datetime
+
+
+class DiscountTier(BaseModel):
+    min_count: int = Field(..., ge=0, le=10000, description="Headcount in the role from which the discount applies")
+    discount: float = Field(..., ge=0, lt=1, description="Share of the role's cost taken off, 0.1 = 10%")
+
+
+class RoleDiscount(BaseModel):
+    role_id: int = Field(..., description="Role ID")
+    tiers: list[DiscountTier] = Field(..., min_length=1, max_length=100)
+
+    @field_validator("tiers")
+    @classmethod
+    def distinct_thresholds(cls, tiers: list[DiscountTier]) -> list[DiscountTier]:
+        if len({tier.min_count for tier in tiers}) != len(tiers):
+            raise ValueError("tier min_count values must be distinct")
+        return tiers
+
+
+class HeadcountTier(BaseModel):
+    min_headcount: int = Field(..., ge=0, le=10000, description="Project headcount from which the multiplier applies")
+    multiplier: float = Field(..., gt=0)
+
+
+class PricingRules(BaseModel):
+    role_discounts: list[RoleDiscount] = Field(default_factory=list, description="Volume discounts per role")
+    headcount_tiers: list[HeadcountTier] = Field(default_factory=list, max_length=100,
+                                                 description="Multipliers by total project headcount")
+    minimum_fee: int = Field(0, ge=0, description="Lowest price of a project that has a team")
+    rush_multiplier: float = Field(1.0, gt=0, description="Multiplier for projects flagged as rush")
+
+    @field_validator("role_discounts")
+    @classmethod
+    def one_entry_per_role(cls, role_discounts: list[RoleDiscount]) -> list[RoleDiscount]:
+        if len({item.role_id for item in role_discounts}) != len(role_discounts):
+            raise ValueError("each role may appear only once")
+        return role_discounts
+
+    @field_validator("headcount_tiers")
+    @classmethod
+    def distinct_headcounts(cls, tiers: list[HeadcountTier]) -> list[HeadcountTier]:
+        if len({tier.min_headcount for tier in tiers}) != len(tiers):
+            raise ValueError("tier min_headcount values must be distinct")
+        return tiers
+
+
+class PricingRuleSetCreate(BaseModel):
+    rules: PricingRules
+    comment: Optional[str] = Field(None, max_length=255, description="What changed in this version")
+
+
+class PricingRuleSetResponse(BaseModel):
+    version: int
+    rules: PricingRules
+    comment: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class PricingRuleSetCreateResponse(PricingRuleSetResponse):
+    repriced_projects: int = Field(default=0, ge=0, description="Projects whose stored price changed under the new rules")
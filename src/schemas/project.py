@@ -1,10 +1,11 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Literal, Optional
 from datetime import datetime
 
 class ProjectBase(BaseModel):
     name: str = Field(..., max_length=255, description="Project name")
     coefficient: float = Field(..., ge=0, description="Project coefficient")
+    rush: bool = Field(False, description="Rush project, priced with the rush multiplier of the pricing rules")
 
 
 class ProjectCreate(ProjectBase):
@@ -15,12 +16,52 @@ class ProjectUpdate(BaseModel):
     name: Optional[str] = Field(None, max_length=255, description="Project name")
     coefficient: Optional[float] = Field(None, ge=0, description="Project coefficient")
     total_price: Optional[int] = Field(None, ge=0, description="Total project price")
+    rush: Optional[bool] = Field(None, description="Rush project")
 
 
 class ProjectResponse(ProjectBase):
     id: int
     total_price: Optional[int] = 0
     created_at: datetime
+    version: int
+    roles_version: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+def naive_datetime(value: Optional[datetime]) -> Optional[datetime]:
+    """Express an aware datetime on the server clock that fills the naive created_at column."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+PROJECTS_PAGE_SIZE_DEFAULT = 50
+PROJECTS_PAGE_SIZE_MAX = 500
+
+
+class ProjectFilterParams(BaseModel):
+    min_coefficient: Optional[float] = Field(None, ge=0, description="Only projects with coefficient >= this value")
+    max_coefficient: Optional[float] = Field(None, ge=0, description="Only projects with coefficient <= this value")
+    min_price: Optional[int] = Field(None, ge=0, description="Only projects with total price >= this value")
+    max_price: Optional[int] = Field(None, ge=0, description="Only projects with total price <= this value")
+    created_from: Optional[datetime] = Field(None, description="Only projects created at or after this moment")
+    created_to: Optional[datetime] = Field(None, description="Only projects created before this moment")
+
+    _naive_created_bounds = field_validator("created_from", "created_to")(naive_datetime)
+
+
+class ProjectListParams(ProjectFilterParams):
+    limit: int = Field(PROJECTS_PAGE_SIZE_DEFAULT, ge=1, le=PROJECTS_PAGE_SIZE_MAX, description="Page size")
+    cursor: Optional[str] = Field(None, description="next_cursor of the previous page")
+    order_by: Literal["id", "created_at"] = Field("id", description="Keyset the pages are ordered by")
+
+
+class ProjectExportParams(ProjectFilterParams):
+    format: Literal["ndjson", "csv"] = Field("ndjson", description="Output format")
+
+
+class ProjectPage(BaseModel):
+    items: list[ProjectResponse]
+    next_cursor: Optional[str] = Field(None, description="Pass as cursor to get the next page; null on the last page")
@@ -29,4 +29,20 @@ class ProjectRoleResponse(ProjectRoleBase):
 
 class ProjectRoleWithDetails(ProjectRoleResponse):
     project: ProjectResponse
-    role: RoleResponse
\ No newline at end of file
+    role: RoleResponse
+
+
+PROJECT_ROLES_IMPORT_MAX_ROWS = 10000
+
+
+class ProjectRoleImportError(BaseModel):
+    row: int = Field(..., description="1-based number of the data row in the uploaded file")
+    message: str
+
+
+class ProjectRoleImportResponse(BaseModel):
+    inserted: int = Field(..., description="Assignments created")
+    updated: int = Field(..., description="Existing (project_id, role_id) assignments overwritten")
+    failed: int = Field(..., description="Rows rejected, see errors")
+    repriced_projects: int
+    errors: list[ProjectRoleImportError]
@@ -20,4 +20,8 @@ class RoleResponse(RoleBase):
     id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class RoleUpdateResponse(RoleResponse):
+    repriced_projects: int = Field(default=0, ge=0, description="Projects repriced because the default rate changed")
@@ -1,116 +1,508 @@
+import asyncio
 import logging
-import redis.asyncio as redis
-import json
+import random
+import time
+import uuid
 from redis import RedisError
 
 from src.config import cache_settings
+from src.db.database import no_unit_of_work
+from src.services.codec import CacheCodec, dumps_json
+from src.services.local_cache import LocalCache, MISSING
+from src.services.metrics import CACHE_REQUESTS
+from src.services.profiler import ProfiledRedis
 
-redis_client = redis.Redis(
+redis_client = ProfiledRedis(
     host=cache_settings.REDIS_HOST,
     port=cache_settings.REDIS_PORT,
     db=cache_settings.REDIS_DB,
-    decode_responses=True
 )
 
+codec = CacheCodec(cache_settings.CACHE_CODEC, cache_settings.CACHE_COMPRESS_MIN_BYTES)
 
+local_cache = LocalCache(max_size=cache_settings.CACHE_L1_MAX_SIZE, ttl=cache_settings.CACHE_L1_TTL)
 
+redis_stats = {"hits": 0, "misses": 0, "errors": 0}
 
-async def get_cached_roles():
+_inflight: dict[str, asyncio.Task] = {}
+
+_refreshes: set[asyncio.Task] = set()
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Entries live under "{namespace}:g{generation}:{name}" and "{namespace}:gen" holds the generation.
+# A missing generation starts at the server clock in microseconds, so it is always above any
+# generation the namespace had before its counter expired or was evicted.
+# An entry in the last ARGV[2] ms of its TTL is stale: the first reader to see it takes a
+# short "{entry}:refresh" marker and is the one (across all instances) that reloads it.
+_READ_SCRIPT = redis_client.register_script("""
+local result = {}
+for i, key in ipairs(KEYS) do
+    local generation = redis.call("get", key)
+    if not generation then
+        local now = redis.call("time")
+        generation = now[1] .. string.format("%06d", tonumber(now[2]))
+        redis.call("set", key, generation, "ex", ARGV[1])
+    end
+    local entry = ARGV[2 * i + 2] .. generation .. ARGV[2 * i + 3]
+    local value = redis.call("get", entry)
+    local refresh = false
+    if value then
+        local ttl = redis.call("pttl", entry)
+        if ttl >= 0 and ttl <= tonumber(ARGV[2]) then
+            refresh = redis.call("set", entry .. ":refresh", "1", "nx", "px", ARGV[3]) and 1 or 0
+        end
+    end
+    result[3 * i - 2] = generation
+    result[3 * i - 1] = value
+    result[3 * i] = refresh
+end
+return result
+""")
+
+_BUMP_SCRIPT = redis_client.register_script("""
+for _, key in ipairs(KEYS) do
+    if redis.call("exists", key) == 1 then
+        redis.call("incr", key)
+        redis.call("expire", key, ARGV[1])
+    else
+        local now = redis.call("time")
+        redis.call("set", key, now[1] .. string.format("%06d", tonumber(now[2])), "ex", ARGV[1])
+    end
+    redis.call("publish", ARGV[2], key)
+end
+return #KEYS
+""")
+
+
+_STATS_KEYS = {"hit": "hits", "miss": "misses", "error": "errors"}
+
+
+def _record(operation: str, result: str):
+    redis_stats[_STATS_KEYS[result]] += 1
+    CACHE_REQUESTS.labels(operation, result).inc()
+
+
+def get_cache_stats() -> dict:
+    lookups = redis_stats["hits"] + redis_stats["misses"]
+    return {
+        "l1": {"enabled": cache_settings.CACHE_L1_ENABLED, **local_cache.stats()},
+        "redis": {**redis_stats, "hit_ratio": redis_stats["hits"] / lookups if lookups else 0.0},
+    }
+
+
+def _generation_key(namespace: str) -> str:
+    return f"{namespace}:gen"
+
+
+def _entry_key(entry: tuple[str, str], generation: str) -> str:
+    namespace, name = entry
+    return f"{namespace}:g{generation}:{name}"
+
+
+def _json_key(entry_key: str) -> str:
+    # L1 only: the entry as response-ready JSON bytes, next to its decoded value
+    return f"{entry_key}:json"
+
+
+# Entry names double as key families for TTL jitter
+_TTL_JITTER = {
+    "roles": cache_settings.CACHE_ROLES_TTL_JITTER,
+    "project_roles": cache_settings.CACHE_PROJECT_ROLES_TTL_JITTER,
+    "project_role": cache_settings.CACHE_PROJECT_ROLE_TTL_JITTER,
+}
+
+
+def _ttl_ms(entry: tuple[str, str]) -> int:
+    """Hard TTL: the family-jittered fresh period plus the window in which the entry is served stale."""
+    jitter = _TTL_JITTER.get(entry[1], cache_settings.CACHE_TTL_JITTER)
+    fresh_seconds = cache_settings.CACHE_TTL * random.uniform(1 - jitter, 1 + jitter)
+    return int((fresh_seconds + cache_settings.CACHE_STALE_TTL) * 1000)
+
+
+async def _lookup(
+        entries: list[tuple[str, str]], operation: str, as_json: bool = False
+) -> tuple[dict, dict, list]:
+    """Read (namespace, name) entries at their namespaces' current generation.
+
+    Returns the entries found (decoded values, or JSON bytes with `as_json`), the
+    generation seen for every entry Redis answered for, and the stale entries this
+    caller must refresh. A miss or refresh must be stored under that generation: if the
+    namespace was invalidated meanwhile, the fill is dead on arrival.
+    """
+    found, generations, refresh, remote = {}, {}, [], []
+    for entry in entries:
+        if cache_settings.CACHE_L1_ENABLED:
+            generation = local_cache.get(_generation_key(entry[0]))
+            if generation is not MISSING:
+                key = _entry_key(entry, generation)
+                if as_json:
+                    body = local_cache.get(_json_key(key))
+                    if body is MISSING:
+                        value = local_cache.get(key)
+                        if value is not MISSING:
+                            # Serialized once, then served as bytes until the entry leaves L1
+                            body = dumps_json(value)
+                            local_cache.set(_json_key(key), body)
+                    if body is not MISSING:
+                        found[entry] = body
+                        continue
+                else:
+                    value = local_cache.get(key)
+                    if value is not MISSING:
+                        found[entry] = value
+                        continue
+        remote.append(entry)
+    if not remote:
+        return found, generations, refresh
+
+    epoch = local_cache.epoch
+    args = [
+        cache_settings.CACHE_GENERATION_TTL, cache_settings.CACHE_STALE_TTL * 1000, cache_settings.CACHE_REFRESH_LOCK_MS
+    ]
+    for namespace, name in remote:
+        args += [f"{namespace}:g", f":{name}"]
     try:
-        cached = await redis_client.get(cache_settings.CACHE_ROLES_KEY)
-        if cached:
-            return json.loads(cached)
-        return None
+        reply = await _READ_SCRIPT(
+            keys=[_generation_key(namespace) for namespace, _ in remote], args=args, client=redis_client
+        )
     except (ConnectionError, TimeoutError) as e:
-        logging.error(f"Redis connection issue in get_cached_roles: {e}")
-        return None
+        _record(operation, "error")
+        logging.error(f"Redis connection issue in {operation}: {e}")
+        return found, generations, refresh
     except RedisError as e:
-        logging.error(f"Redis error in get_cached_roles: {e}")
-        return None
+        _record(operation, "error")
+        logging.error(f"Redis error in {operation}: {e}")
+        return found, generations, refresh
 
-async def set_cached_roles(roles: list):
+    for i, entry in enumerate(remote):
+        generation, cached, stale = reply[3 * i].decode(), reply[3 * i + 1], reply[3 * i + 2]
+        generations[entry] = generation
+        if cache_settings.CACHE_L1_ENABLED:
+            local_cache.set(_generation_key(entry[0]), generation, epoch)
+        if not cached:
+            _record(operation, "miss")
+            continue
+        _record(operation, "hit")
+        if stale == 1:
+            refresh.append(entry)
+        found[entry] = codec.to_json(cached) if as_json else codec.decode(cached)
+        # Stale values are served, but not copied into L1 where they would outlive the refresh
+        if cache_settings.CACHE_L1_ENABLED and stale is None:
+            key = _entry_key(entry, generation)
+            local_cache.set(_json_key(key) if as_json else key, found[entry])
+    return found, generations, refresh
+
+
+async def _store(values: dict, generations: dict, operation: str):
+    """Write entries in one pipelined round trip, each under the generation it was read at."""
+    entries = {entry: value for entry, value in values.items() if generations.get(entry) is not None}
+    if not entries:
+        return
     try:
-        await redis_client.set(cache_settings.CACHE_ROLES_KEY, json.dumps(roles), ex=cache_settings.CACHE_TTL)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for entry, value in entries.items():
+                pipe.set(_entry_key(entry, generations[entry]), codec.encode(value), px=_ttl_ms(entry))
+            await pipe.execute()
+        if cache_settings.CACHE_L1_ENABLED:
+            # Entry keys never change meaning, so no epoch check: a dead one is simply never read again
+            for entry, value in entries.items():
+                local_cache.set(_entry_key(entry, generations[entry]), value)
     except (ConnectionError, TimeoutError) as e:
-        logging.error(f"Redis connection issue in set_cached_roles: {e}")
+        _record(operation, "error")
+        logging.error(f"Redis connection issue in {operation}: {e}")
     except RedisError as e:
-        logging.error(f"Redis error in set_cached_roles: {e}")
+        _record(operation, "error")
+        logging.error(f"Redis error in {operation}: {e}")
 
-async def invalidate_roles_cache():
+
+async def _invalidate(namespaces: list[str], operation: str):
+    """Move namespaces to a new generation, orphaning every entry (and in-flight fill) of the old one."""
+    keys = [_generation_key(namespace) for namespace in dict.fromkeys(namespaces)]
+    if not keys:
+        return
+    for key in keys:
+        local_cache.delete(key)
     try:
-        await redis_client.delete(cache_settings.CACHE_ROLES_KEY)
+        await _BUMP_SCRIPT(
+            keys=keys,
+            args=[cache_settings.CACHE_GENERATION_TTL, cache_settings.CACHE_INVALIDATION_CHANNEL],
+            client=redis_client,
+        )
     except (ConnectionError, TimeoutError) as e:
-        logging.error(f"Redis connection issue in invalidate_roles_cache: {e}")
+        _record(operation, "error")
+        logging.error(f"Redis connection issue in {operation}: {e}")
     except RedisError as e:
-        logging.error(f"Redis error in invalidate_roles_cache: {e}")
+        _record(operation, "error")
+        logging.error(f"Redis error in {operation}: {e}")
 
-def project_roles_cache_key(project_id: int) -> str:
-    return f"{cache_settings.CACHE_PROJECT_ROLES_PREFIX}{project_id}"
 
-def project_role_cache_key(project_role_id: int) -> str:
-    return f"{cache_settings.CACHE_PROJECT_ROLE_PREFIX}{project_role_id}"
+async def _get(entry: tuple[str, str], operation: str):
+    found, _, _ = await _lookup([entry], operation)
+    return found.get(entry)
 
-async def get_cached_project_roles_by_project_id(project_id: int):
-    key = project_roles_cache_key(project_id)
+
+async def _set(entry: tuple[str, str], value, operation: str):
+    # Without a generation from an earlier read, store under the current one: only for callers
+    # that cannot thread the generation through (get_or_load_* is race-free, prefer it)
+    _, generations, _ = await _lookup([entry], operation)
+    await _store({entry: value}, generations, operation)
+
+
+def _refresh_in_background(load, operation: str):
+    """Run `load()` detached from the request that found the entries stale; it stores what it loads."""
+    async def refresh():
+        try:
+            with no_unit_of_work():
+                await load()
+        except Exception as e:
+            logging.error(f"Background cache refresh failed in {operation}: {e}")
+
+    task = asyncio.create_task(refresh())
+    _refreshes.add(task)
+    task.add_done_callback(_refreshes.discard)
+
+
+
+async def _load_and_store(entry: tuple[str, str], generation: str | None, loader, operation: str):
+    value = await loader()
+    await _store({entry: value}, {entry: generation}, operation)
+    return value
+
+
+async def _load_with_lock(entry: tuple[str, str], generation: str | None, loader, operation: str):
+    if not cache_settings.CACHE_LOCK_ENABLED or generation is None:
+        return await _load_and_store(entry, generation, loader, operation)
+
+    lock_key = f"lock:{_entry_key(entry, generation)}"
+    token = uuid.uuid4().hex
     try:
-        cached = await redis_client.get(key)
-        if cached:
-            return json.loads(cached)
-        return None
-    except (ConnectionError, TimeoutError) as e:
-        logging.error(f"Redis connection issue in get_cached_project_roles_by_project_id: {e}")
-        return None
-    except RedisError as e:
-        logging.error(f"Redis error in get_cached_project_roles_by_project_id: {e}")
-        return None
+        acquired = await redis_client.set(lock_key, token, nx=True, px=cache_settings.CACHE_LOCK_TIMEOUT_MS)
+    except (ConnectionError, TimeoutError, RedisError) as e:
+        logging.error(f"Redis error acquiring lock in {operation}: {e}")
+        return await loader()
+
+    if acquired:
+        try:
+            # Another instance may have filled the key between our miss and the lock
+            found, generations, _ = await _lookup([entry], operation)
+            if found.get(entry) is not None:
+                return found[entry]
+            return await _load_and_store(entry, generations.get(entry, generation), loader, operation)
+        finally:
+            try:
+                await redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            except (ConnectionError, TimeoutError, RedisError) as e:
+                logging.error(f"Redis error releasing lock in {operation}: {e}")
+
+    deadline = time.monotonic() + cache_settings.CACHE_LOCK_WAIT_MS / 1000
+    while time.monotonic() < deadline:
+        await asyncio.sleep(cache_settings.CACHE_LOCK_POLL_MS / 1000)
+        found, generations, _ = await _lookup([entry], operation)
+        if found.get(entry) is not None:
+            return found[entry]
+        generation = generations.get(entry, generation)
+    # The holder is slow or gone: load ourselves rather than fail the request
+    return await _load_and_store(entry, generation, loader, operation)
+
+
+async def _load_detached(entry: tuple[str, str], generation: str | None, loader, operation: str):
+    # The shared load outlives the request that started it and must only see committed rows
+    with no_unit_of_work():
+        return await _load_with_lock(entry, generation, loader, operation)
+
+
+async def single_flight(entry: tuple[str, str], generation: str | None, loader, operation: str):
+    """Coalesce concurrent cache misses on `entry` at `generation` into a single `loader` call.
+
+    Callers in this process share one task; with CACHE_LOCK_ENABLED a Redis lock
+    extends this across instances. The shared task is shielded so one cancelled
+    request does not abort the load for the others. Callers that saw a newer
+    generation start their own load instead of joining one that may predate the write.
+    """
+    key = _entry_key(entry, generation)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_load_detached(entry, generation, loader, operation))
+        _inflight[key] = task
+
+        def _forget(done: asyncio.Task):
+            if _inflight.get(key) is done:
+                del _inflight[key]
+
+        task.add_done_callback(_forget)
+    return await asyncio.shield(task)
+
+
+async def _get_or_load(entry: tuple[str, str], loader, operation: str):
+    found, generations, refresh = await _lookup([entry], operation)
+    if refresh:
+        _refresh_in_background(lambda: _load_and_store(entry, generations[entry], loader, operation), operation)
+    if found.get(entry) is not None:
+        return found[entry]
+    return await single_flight(entry, generations.get(entry), loader, operation)
+
+
+async def _get_or_load_json(entry: tuple[str, str], loader, operation: str) -> bytes:
+    found, generations, refresh = await _lookup([entry], operation, as_json=True)
+    if refresh:
+        _refresh_in_background(lambda: _load_and_store(entry, generations[entry], loader, operation), operation)
+    if entry in found and found[entry] != b"null":
+        return found[entry]
+    return dumps_json(await single_flight(entry, generations.get(entry), loader, operation))
+
+
+async def _get_or_load_many(entries: dict, load_missing, operation: str) -> dict:
+    """Look up many entries in one round trip and fill the misses with one `load_missing` call.
+
+    `entries` maps ids to (namespace, name); `load_missing(ids)` returns {id: value}.
+    """
+    found, generations, refresh = await _lookup(list(entries.values()), operation)
+    if refresh:
+        stale_ids = [id for id, entry in entries.items() if entry in refresh]
+
+        async def reload_stale():
+            loaded = await load_missing(stale_ids)
+            await _store({entries[id]: value for id, value in loaded.items()}, generations, operation)
+
+        _refresh_in_background(reload_stale, operation)
+
+    values = {id: found[entry] for id, entry in entries.items() if found.get(entry) is not None}
+    missed = [id for id in entries if id not in values]
+    if missed:
+        loaded = await load_missing(missed)
+        await _store({entries[id]: value for id, value in loaded.items()}, generations, operation)
+        values.update(loaded)
+    return values
+
+
+async def run_invalidation_listener():
+    """Evict local generations invalidated by any worker or instance.
+
+    Messages published while the subscription is down are lost, so the whole
+    local tier is dropped every time the listener (re)subscribes.
+    """
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(cache_settings.CACHE_INVALIDATION_CHANNEL)
+            local_cache.clear()
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is not None:
+                    local_cache.delete(message["data"].decode())
+        except asyncio.CancelledError:
+            raise
+        except (ConnectionError, TimeoutError, RedisError) as e:
+            logging.error(f"Redis error in run_invalidation_listener: {e}")
+            local_cache.clear()
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
+
+
+async def warm_up_redis(connections: int):
+    """Open `connections` pooled connections and load the Lua scripts, so first requests skip both."""
+    await asyncio.gather(*(redis_client.ping() for _ in range(connections)))
+    for script in (_READ_SCRIPT, _BUMP_SCRIPT):
+        await redis_client.script_load(script.script)
+
+
+async def close_cache():
+    # Refreshes store what they load: cancel them before the connection pool goes away
+    for task in list(_refreshes):
+        task.cancel()
+    await asyncio.gather(*_refreshes, return_exceptions=True)
+    await redis_client.aclose()
+    local_cache.clear()
+
+
+ROLES_ENTRY = (cache_settings.CACHE_ROLES_NAMESPACE, "roles")
+CURRENT_PRICING_RULES_ENTRY = (cache_settings.CACHE_PRICING_RULES_NAMESPACE, "pricing_rules")
+
+async def get_cached_roles():
+    return await _get(ROLES_ENTRY, "get_cached_roles")
+
+async def set_cached_roles(roles: list):
+    await _set(ROLES_ENTRY, roles, "set_cached_roles")
+
+async def invalidate_roles_cache():
+    await _invalidate([ROLES_ENTRY[0]], "invalidate_roles_cache")
+
+async def get_or_load_roles(loader):
+    return await _get_or_load(ROLES_ENTRY, loader, "get_or_load_roles")
+
+async def get_or_load_roles_json(loader) -> bytes:
+    return await _get_or_load_json(ROLES_ENTRY, loader, "get_or_load_roles_json")
+
+def project_namespace(project_id: int) -> str:
+    # Everything cached per project (its team, its versions) goes stale together
+    return f"{cache_settings.CACHE_PROJECT_NAMESPACE_PREFIX}{project_id}"
+
+def project_role_namespace(project_role_id: int) -> str:
+    return f"{cache_settings.CACHE_PROJECT_ROLE_NAMESPACE_PREFIX}{project_role_id}"
+
+def project_roles_entry(project_id: int) -> tuple[str, str]:
+    return project_namespace(project_id), "project_roles"
+
+def project_versions_entry(project_id: int) -> tuple[str, str]:
+    return project_namespace(project_id), "project_versions"
+
+def project_role_entry(project_role_id: int) -> tuple[str, str]:
+    return project_role_namespace(project_role_id), "project_role"
+
+async def invalidate_project_cache_many(project_ids: list[int]):
+    """Drop the cached team and versions of every project in one round trip."""
+    namespaces = [project_namespace(project_id) for project_id in project_ids]
+    await _invalidate(namespaces, "invalidate_project_cache_many")
+
+async def get_cached_project_roles_by_project_id(project_id: int):
+    return await _get(project_roles_entry(project_id), "get_cached_project_roles_by_project_id")
 
 async def set_cached_project_roles_by_project_id(project_id: int, project_roles_data: list):
-    key = project_roles_cache_key(project_id)
-    try:
-        await redis_client.set(key, json.dumps(project_roles_data), ex=cache_settings.CACHE_TTL)
-    except (ConnectionError, TimeoutError) as e:
-        logging.error(f"Redis connection issue in set_cached_project_roles_by_project_id: {e}")
-    except RedisError as e:
-        logging.error(f"Redis error in set_cached_project_roles_by_project_id: {e}")
+    await _set(project_roles_entry(project_id), project_roles_data, "set_cached_project_roles_by_project_id")
 
 async def invalidate_project_roles_cache_by_project_id(project_id: int):
-    key = project_roles_cache_key(project_id)
-    try:
-        await redis_client.delete(key)
-    except (ConnectionError, TimeoutError) as e:
-        logging.error(f"Redis connection issue in invalidate_project_roles_cache_by_project_id: {e}")
-    except RedisError as e:
-        logging.error(f"Redis error in invalidate_project_roles_cache_by_project_id: {e}")
+    await _invalidate([project_namespace(project_id)], "invalidate_project_roles_cache_by_project_id")
+
+async def get_or_load_project_roles_many(project_ids: list[int], load_missing) -> dict[int, list]:
+    entries = {project_id: project_roles_entry(project_id) for project_id in project_ids}
+    return await _get_or_load_many(entries, load_missing, "get_or_load_project_roles_many")
+
+async def get_or_load_project_roles_by_project_id(project_id: int, loader):
+    return await _get_or_load(project_roles_entry(project_id), loader, "get_or_load_project_roles_by_project_id")
+
+async def get_or_load_project_roles_json_by_project_id(project_id: int, loader) -> bytes:
+    return await _get_or_load_json(
+        project_roles_entry(project_id), loader, "get_or_load_project_roles_json_by_project_id"
+    )
 
 async def get_cached_project_role_by_id(project_role_id: int):
-    key = project_role_cache_key(project_role_id)
-    try:
-        cached = await redis_client.get(key)
-        if cached:
-            return json.loads(cached)
-        return None
-    except (ConnectionError, TimeoutError) as e:
-        logging.error(f"Redis connection issue in get_cached_project_role_by_id: {e}")
-        return None
-    except RedisError as e:
-        logging.error(f"Redis error in get_cached_project_role_by_id: {e}")
-        return None
+    return await _get(project_role_entry(project_role_id), "get_cached_project_role_by_id")
 
 async def set_cached_project_role_by_id(project_role_id: int, project_role_data: dict):
-    key = project_role_cache_key(project_role_id)
-    try:
-        await redis_client.set(key, json.dumps(project_role_data), ex=cache_settings.CACHE_TTL)
-    except (ConnectionError, TimeoutError) as e:
-        logging.error(f"Redis connection issue in set_cached_project_role_by_id: {e}")
-    except RedisError as e:
-        logging.error(f"Redis error in set_cached_project_role_by_id: {e}")
+    await _set(project_role_entry(project_role_id), project_role_data, "set_cached_project_role_by_id")
+
+async def get_or_load_project_role_by_id(project_role_id: int, loader):
+    return await _get_or_load(project_role_entry(project_role_id), loader, "get_or_load_project_role_by_id")
 
 async def invalidate_project_role_cache_by_id(project_role_id: int):
-    key = project_role_cache_key(project_role_id)
-    try:
-        await redis_client.delete(key)
-    except (ConnectionError, TimeoutError) as e:
-        logging.error(f"Redis connection issue in invalidate_project_role_cache_by_id: {e}")
-    except RedisError as e:
-        logging.error(f"Redis error in invalidate_project_role_cache_by_id: {e}")
+    await _invalidate([project_role_namespace(project_role_id)], "invalidate_project_role_cache_by_id")
+
+async def invalidate_project_role_cache_many(project_role_ids: list[int]):
+    namespaces = [project_role_namespace(project_role_id) for project_role_id in project_role_ids]
+    await _invalidate(namespaces, "invalidate_project_role_cache_many")
+
+async def get_or_load_current_pricing_rules(loader):
+    return await _get_or_load(CURRENT_PRICING_RULES_ENTRY, loader, "get_or_load_current_pricing_rules")
+
+async def invalidate_current_pricing_rules_cache():
+    await _invalidate([CURRENT_PRICING_RULES_ENTRY[0]], "invalidate_current_pricing_rules_cache")
 
+async def get_or_load_project_versions(project_id: int, loader):
+    return await _get_or_load(project_versions_entry(project_id), loader, "get_or_load_project_versions")
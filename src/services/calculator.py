@@ -1,3 +1,8 @@
+import numpy as np
+
+from src.services.metrics import PRICE_CAP_HITS
+
+MAX_TOTAL_PRICE = 2000000000
 
 
 def calculate_cost(team_roles, coefficients):
@@ -12,4 +17,81 @@ def calculate_cost(team_roles, coefficients):
         total_coefficient *= coef
 
     total_cost = base_cost * total_coefficient
-    return total_cost
\ No newline at end of file
+    return total_cost
+
+
+def cap_total_price(total_price):
+    if total_price > MAX_TOTAL_PRICE:
+        PRICE_CAP_HITS.inc()
+        return MAX_TOTAL_PRICE
+    return total_price
+
+
+def calculate_costs(size, role_index, counts, rates, coefficient_index, coefficients):
+    """Vectorized calculate_cost for `size` projects at once.
+
+    `role_index` / `coefficient_index` map every team row / coefficient to its
+    project's position in the result. Base costs are summed as exact integers and
+    coefficients are multiplied in input order, so each total is bit-for-bit what
+    calculate_cost returns for the same project.
+    """
+    base_costs = np.zeros(size, dtype=np.int64)
+    np.add.at(base_costs, np.asarray(role_index, dtype=np.intp),
+              np.asarray(counts, dtype=np.int64) * np.asarray(rates, dtype=np.int64))
+
+    total_coefficients = np.ones(size, dtype=np.float64)
+    np.multiply.at(total_coefficients, np.asarray(coefficient_index, dtype=np.intp),
+                   np.asarray(coefficients, dtype=np.float64))
+
+    return base_costs * total_coefficients
+
+
+def team_index(project_ids, team_project_ids):
+    """Position of every team row's project in `project_ids` (sorted), and which rows have one."""
+    size = len(project_ids)
+    role_index = np.searchsorted(project_ids, team_project_ids)
+    known = role_index < size
+    known[known] = project_ids[role_index[known]] == team_project_ids[known]
+    return role_index[known], known
+
+
+def price_projects(projects, team_rows):
+    """Price many projects in one vectorized pass.
+
+    `projects` are (project_id, coefficient, ...) rows ordered by id and `team_rows` are
+    (project_id, role_id, count, rate) rows. Returns (project_id, total_price) pairs in project
+    order, with total_price None for projects that have no roles.
+    """
+    size = len(projects)
+    project_ids = np.fromiter((row[0] for row in projects), dtype=np.int64, count=size)
+    coefficients = [row[1] for row in projects]
+
+    team_project_ids = np.fromiter((row[0] for row in team_rows), dtype=np.int64, count=len(team_rows))
+    counts = np.fromiter((row[2] for row in team_rows), dtype=np.int64, count=len(team_rows))
+    rates = np.fromiter((row[3] for row in team_rows), dtype=np.int64, count=len(team_rows))
+
+    role_index, known = team_index(project_ids, team_project_ids)
+
+    totals = calculate_costs(size, role_index, counts[known], rates[known], np.arange(size), coefficients)
+    has_roles = np.bincount(role_index, minlength=size) > 0
+
+    return [
+        (project_id, cap_total_price(total) if priced else None)
+        for project_id, total, priced in zip(project_ids.tolist(), totals.tolist(), has_roles.tolist())
+    ]
+
+
+def price_surface(fixed_base_cost, team_axes, coefficients):
+    """calculate_cost over a grid of team compositions and coefficients, capped like stored prices.
+
+    `fixed_base_cost` is the count x rate sum of the roles that do not vary. `team_axes` holds one
+    (counts, rates) pair per varied role, each a sequence (a grid axis) or a single value, and
+    `coefficients` is a sequence or a single value. The result has one dimension per sequence,
+    in argument order, and each point equals cap_total_price(calculate_cost(...)) for that team.
+    """
+    base_costs = np.asarray(fixed_base_cost, dtype=np.int64)
+    for counts, rates in team_axes:
+        team_costs = np.multiply.outer(np.asarray(counts, dtype=np.int64), np.asarray(rates, dtype=np.int64))
+        base_costs = np.add.outer(base_costs, team_costs)
+    totals = np.multiply.outer(base_costs, np.asarray(coefficients, dtype=np.float64))
+    return np.minimum(totals, MAX_TOTAL_PRICE)
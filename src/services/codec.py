@@ -0,0 +1,108 @@
+import json
+import zlib
+
+import orjson
+
+# Stored values are: FORMAT_VERSION, codec tag, compression flag, payload.
+# Values written without this header (plain JSON) are still readable.
+FORMAT_VERSION = b"\x01"
+COMPRESSED = b"z"
+UNCOMPRESSED = b"-"
+HEADER_SIZE = 3
+
+
+class JsonCodec:
+    tag = b"j"
+    json_compatible = True
+
+    def dumps(self, value) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def loads(self, payload: bytes):
+        return json.loads(payload)
+
+
+class OrjsonCodec:
+    tag = b"o"
+    json_compatible = True
+
+    def dumps(self, value) -> bytes:
+        return orjson.dumps(value)
+
+    def loads(self, payload: bytes):
+        return orjson.loads(payload)
+
+
+class MsgpackCodec:
+    tag = b"m"
+    json_compatible = False
+
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError as e:
+            raise RuntimeError("CACHE_CODEC=msgpack requires the msgpack package") from e
+        self._msgpack = msgpack
+
+    def dumps(self, value) -> bytes:
+        return self._msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, payload: bytes):
+        return self._msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+
+CODECS = {
+    "json": JsonCodec,
+    "orjson": OrjsonCodec,
+    "msgpack": MsgpackCodec,
+}
+
+
+def dumps_json(value) -> bytes:
+    return orjson.dumps(value)
+
+
+class CacheCodec:
+    """Encodes cache values with the configured codec and reads any known one.
+
+    Every codec tag can be decoded regardless of the configured writer, so a
+    rolling deploy that switches codecs does not turn existing keys into misses.
+    """
+
+    def __init__(self, name: str, compress_min_bytes: int = 0):
+        if name not in CODECS:
+            raise ValueError(f"Unknown cache codec: {name}")
+        self.writer = CODECS[name]()
+        self.compress_min_bytes = compress_min_bytes
+        self._readers = {self.writer.tag: self.writer}
+
+    def _reader(self, tag: bytes):
+        reader = self._readers.get(tag)
+        if reader is None:
+            codec = next((codec for codec in CODECS.values() if codec.tag == tag), None)
+            if codec is None:
+                raise ValueError(f"Unknown cache codec tag: {tag!r}")
+            reader = self._readers[tag] = codec()
+        return reader
+
+    def encode(self, value) -> bytes:
+        payload = self.writer.dumps(value)
+        if self.compress_min_bytes and len(payload) >= self.compress_min_bytes:
+            return FORMAT_VERSION + self.writer.tag + COMPRESSED + zlib.compress(payload)
+        return FORMAT_VERSION + self.writer.tag + UNCOMPRESSED + payload
+
+    def decode(self, raw: bytes):
+        if raw[:1] != FORMAT_VERSION:
+            return json.loads(raw)
+        payload = raw[HEADER_SIZE:]
+        if raw[2:3] == COMPRESSED:
+            payload = zlib.decompress(payload)
+        return self._reader(raw[1:2]).loads(payload)
+
+    def to_json(self, raw: bytes) -> bytes:
+        """JSON bytes of a stored value, without decoding it when the payload already is JSON."""
+        if raw[:1] != FORMAT_VERSION:
+            return bytes(raw)
+        if raw[2:3] == UNCOMPRESSED and self._reader(raw[1:2]).json_compatible:
+            return raw[HEADER_SIZE:]
+        return dumps_json(self.decode(raw))
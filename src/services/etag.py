@@ -0,0 +1,27 @@
+from fastapi import Response, status
+
+
+def project_etag(project_id: int, versions: dict) -> str:
+    return f'"project-{project_id}-{versions["version"]}"'
+
+
+def project_roles_etag(project_id: int, versions: dict) -> str:
+    return f'"project-roles-{project_id}-{versions["roles_version"]}"'
+
+
+def project_cost_etag(project_id: int, versions: dict, pricing_version: int) -> str:
+    # Price depends on the project row, its team and the rules in force; role rate changes reprice (bump) the row
+    return f'"project-cost-{project_id}-{versions["version"]}-{versions["roles_version"]}-{pricing_version}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match check with the weak comparison RFC 9110 prescribes for it."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,58 @@
+import csv
+import io
+import logging
+import time
+from typing import AsyncIterator
+
+from src.services.codec import dumps_json
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _ndjson_chunk(columns: tuple[str, ...], rows: list[tuple]) -> bytes:
+    return b"".join(dumps_json(dict(zip(columns, row))) + b"\n" for row in rows)
+
+
+def _csv_chunk(rows: list[tuple]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [value.isoformat() if hasattr(value, "isoformat") else value for value in row] for row in rows
+    )
+    return buffer.getvalue().encode()
+
+
+async def start_batches(batches: AsyncIterator[list[tuple]]) -> AsyncIterator[list[tuple]]:
+    """Fetch the first batch now, so a failing query becomes an error response rather than a cut-off body.
+
+    Returns an iterator over every batch, the first one included.
+    """
+    first = await anext(batches, None)
+
+    async def resumed():
+        if first is not None:
+            yield first
+            async for rows in batches:
+                yield rows
+
+    return resumed()
+
+
+async def encode_rows(
+        name: str, columns: tuple[str, ...], batches: AsyncIterator[list[tuple]], fmt: str
+) -> AsyncIterator[bytes]:
+    """Turn batches of rows into NDJSON or CSV chunks, one chunk per batch, and log the throughput."""
+    started = time.perf_counter()
+    rows_sent = 0
+    if fmt == "csv":
+        yield _csv_chunk([columns])
+    try:
+        async for rows in batches:
+            rows_sent += len(rows)
+            yield _csv_chunk(rows) if fmt == "csv" else _ndjson_chunk(columns, rows)
+    finally:
+        elapsed = time.perf_counter() - started
+        rate = rows_sent / elapsed if elapsed > 0 else 0.0
+        logging.info(f"Export {name} ({fmt}): {rows_sent} rows in {elapsed:.2f}s, {rate:.0f} rows/s")
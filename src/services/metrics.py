@@ -0,0 +1,129 @@
+import inspect
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from starlette.routing import Match
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time to serve a request, until its last body chunk is sent",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests being served right now", ["method", "route"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_redis_requests_total", "Redis hits, misses and errors by cache function", ["operation", "result"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time by repository method", ["repository_method"],
+    buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, 5.0),
+)
+PROJECTS_PRICED = Counter(
+    "calculator_projects_priced_total", "Projects priced by the calculator", ["path"],
+)
+PRICE_CAP_HITS = Counter(
+    "calculator_price_cap_hits_total", "Calculated prices clamped to MAX_TOTAL_PRICE",
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+repository_method: ContextVar[str] = ContextVar("repository_method", default="other")
+
+
+def instrument_repository(cls):
+    """Label the SQL run by each async static method of a CRUD class with `Class.method`."""
+    for name, attribute in list(vars(cls).items()):
+        if isinstance(attribute, staticmethod) and inspect.iscoroutinefunction(attribute.__func__):
+            setattr(cls, name, staticmethod(_label_queries(f"{cls.__name__}.{name}", attribute.__func__)))
+    return cls
+
+
+def _label_queries(label: str, method):
+    @wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = repository_method.set(label)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            repository_method.reset(token)
+    return wrapper
+
+
+def _route_template(scope) -> str:
+    # Label by path template, never by raw path, to keep the series count bounded
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: per-route latency histogram and in-flight gauge."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = _route_template(scope)
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method, route)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_DURATION.labels(method, route, status).observe(time.perf_counter() - started)
+            in_flight.dec()
+
+
+class RuntimeStatsCollector:
+    """Exposes the pool and in-process cache counters we already keep, read at scrape time."""
+
+    def __init__(self, get_pool_stats, get_cache_stats):
+        self.get_pool_stats = get_pool_stats
+        self.get_cache_stats = get_cache_stats
+
+    def collect(self):
+        connections = GaugeMetricFamily(
+            "db_pool_connections", "Pool connections by state", labels=["engine", "state"]
+        )
+        waits = CounterMetricFamily("db_pool_waits", "Connection checkouts", labels=["engine"])
+        wait_seconds = CounterMetricFamily(
+            "db_pool_wait_seconds", "Time spent waiting for a connection", labels=["engine"]
+        )
+        timeouts = CounterMetricFamily("db_pool_timeouts", "Checkouts that hit the pool timeout", labels=["engine"])
+        for engine, stats in self.get_pool_stats().items():
+            for state in ("checked_out", "checked_in", "overflow"):
+                connections.add_metric([engine, state], stats[state])
+            waits.add_metric([engine], stats["waits"])
+            wait_seconds.add_metric([engine], stats["wait_seconds_avg"] * stats["waits"])
+            timeouts.add_metric([engine], stats["timeouts"])
+        yield from (connections, waits, wait_seconds, timeouts)
+
+        l1 = self.get_cache_stats()["l1"]
+        yield GaugeMetricFamily("cache_l1_entries", "Entries in the in-process cache", value=l1["size"])
+        lookups = CounterMetricFamily("cache_l1_lookups", "In-process cache lookups", labels=["result"])
+        lookups.add_metric(["hit"], l1["hits"])
+        lookups.add_metric(["miss"], l1["misses"])
+        yield lookups
+        removals = CounterMetricFamily("cache_l1_removals", "Entries dropped from the in-process cache",
+                                       labels=["reason"])
+        for reason in ("evictions", "expirations", "invalidations"):
+            removals.add_metric([reason], l1[reason])
+        yield removals
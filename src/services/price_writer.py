@@ -0,0 +1,96 @@
+import asyncio
+import logging
+
+from src.config import pricing_settings
+from src.db.database import no_unit_of_work
+from src.repositories.project import ProjectCRUD
+
+
+class PriceWriteBehind:
+    """Coalesces calculator price writes and persists them in batched UPDATEs.
+
+    Only the latest price per project is kept, prices equal to what the row holds
+    (or is about to hold) are never written, and the buffer is flushed every
+    `flush_interval` seconds, as soon as `max_pending` projects are waiting, and on
+    shutdown, where a failing flush is retried `final_attempts` times.
+    """
+
+    def __init__(self, flush_interval: float, max_pending: int, final_attempts: int):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.final_attempts = final_attempts
+        self._pending: dict[int, int] = {}
+        # The batch being written and the last one written
+        self._in_flight: dict[int, int] = {}
+        self._flushed: dict[int, int] = {}
+        self._lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        self._loop_task: asyncio.Task | None = None
+
+    def submit(self, project_id: int, total_price, stored_price: int | None):
+        if project_id in self._pending:
+            stored_price = self._pending[project_id]
+        elif project_id in self._in_flight or project_id in self._flushed:
+            # stored_price may predate our own write: queue it, the UPDATE skips rows already equal
+            stored_price = None
+        # The column is an integer, so compare what would actually be stored
+        if stored_price is not None and int(total_price) == int(stored_price):
+            return
+        self._pending[project_id] = total_price
+        if len(self._pending) >= self.max_pending and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            self._in_flight = batch
+            try:
+                with no_unit_of_work():
+                    await ProjectCRUD.set_project_prices(batch)
+            except Exception as e:
+                logging.error(f"Price write-behind flush of {len(batch)} projects failed: {e}")
+                # Keep anything submitted meanwhile: it is newer than the failed batch
+                for project_id, total_price in batch.items():
+                    self._pending.setdefault(project_id, total_price)
+            else:
+                self._flushed = batch
+            finally:
+                self._in_flight = {}
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        for attempt in range(self.final_attempts):
+            if attempt:
+                await asyncio.sleep(self.flush_interval)
+            await self.flush()
+            if not self._pending:
+                return
+        # Last resort: one project at a time, so a single bad row cannot lose the whole buffer
+        for project_id, total_price in self._pending.items():
+            try:
+                with no_unit_of_work():
+                    await ProjectCRUD.set_project_price(project_id, total_price)
+            except Exception as e:
+                logging.error(f"Price of project {project_id} ({total_price}) lost on shutdown: {e}")
+        self._pending = {}
+
+
+price_writer = PriceWriteBehind(
+    flush_interval=pricing_settings.PRICE_FLUSH_INTERVAL,
+    max_pending=pricing_settings.PRICE_FLUSH_MAX_PENDING,
+    final_attempts=pricing_settings.PRICE_FLUSH_FINAL_ATTEMPTS,
+)
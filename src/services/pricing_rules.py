@@ -0,0 +1,157 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from src.repositories.pricing_rule import PricingRuleCRUD
+from src.schemas.pricing_rule import PricingRules
+from src.services.calculator import (MAX_TOTAL_PRICE, calculate_cost, cap_total_price, price_projects, price_surface,
+                                     team_index)
+from src.services.metrics import PRICE_CAP_HITS
+
+MAX_CACHED_PLANS = 8
+
+
+def _tier_table(tiers: list[tuple[int, float]], default: float) -> np.ndarray:
+    """Entry n holds the value of the highest tier whose threshold is <= n; larger n use the last entry."""
+    table = np.full(max(threshold for threshold, _ in tiers) + 1, default, dtype=np.float64)
+    for threshold, value in sorted(tiers):
+        table[threshold:] = value
+    return table
+
+
+class PricingPlan:
+    """One rule set version compiled into lookup tables, so pricing never parses rules per request.
+
+    A project with a team is priced as
+        sum(count * rate * (1 - discount of the role at that count))
+        * multiplier at the project's total headcount * coefficient * (rush_multiplier if rush),
+    raised to minimum_fee and capped at MAX_TOTAL_PRICE. Without rules every path delegates to
+    calculate_cost and its vectorized twins, so prices stay exactly what they were.
+    """
+
+    def __init__(self, version: int, rules: PricingRules):
+        self.version = version
+        self.is_default = rules == PricingRules()
+        self.minimum_fee = rules.minimum_fee
+        self.rush_multiplier = rules.rush_multiplier
+
+        # All roles' discount tables in one flat array; entry 0 is "no discount" for roles without rules
+        tables = [np.zeros(1)]
+        self._discount_start = {}
+        self._discount_end = {}
+        offset = 1
+        for role_discount in rules.role_discounts:
+            table = _tier_table([(tier.min_count, tier.discount) for tier in role_discount.tiers], 0.0)
+            tables.append(table)
+            self._discount_start[role_discount.role_id] = offset
+            self._discount_end[role_discount.role_id] = offset + len(table) - 1
+            offset += len(table)
+        self._discounts = np.concatenate(tables)
+
+        self._headcount_multipliers = np.ones(1)
+        if rules.headcount_tiers:
+            self._headcount_multipliers = _tier_table(
+                [(tier.min_headcount, tier.multiplier) for tier in rules.headcount_tiers], 1.0
+            )
+
+    def _kept_share(self, role_id: int, counts: np.ndarray) -> np.ndarray:
+        start = self._discount_start.get(role_id, 0)
+        end = self._discount_end.get(role_id, 0)
+        return 1 - self._discounts[np.minimum(start + counts, end)]
+
+    def _headcount_multiplier(self, headcounts: np.ndarray) -> np.ndarray:
+        return self._headcount_multipliers[np.minimum(headcounts, len(self._headcount_multipliers) - 1)]
+
+    def price_projects(self, projects, team_rows):
+        """price_projects under this plan: `projects` are (project_id, coefficient, rush) rows ordered by id."""
+        if self.is_default:
+            return price_projects(projects, team_rows)
+
+        size = len(projects)
+        project_ids = np.fromiter((row[0] for row in projects), dtype=np.int64, count=size)
+        coefficients = np.fromiter((row[1] for row in projects), dtype=np.float64, count=size)
+        rush = np.fromiter((row[2] for row in projects), dtype=bool, count=size)
+
+        rows = len(team_rows)
+        team_project_ids = np.fromiter((row[0] for row in team_rows), dtype=np.int64, count=rows)
+        starts = np.fromiter((self._discount_start.get(row[1], 0) for row in team_rows), dtype=np.int64, count=rows)
+        ends = np.fromiter((self._discount_end.get(row[1], 0) for row in team_rows), dtype=np.int64, count=rows)
+        counts = np.fromiter((row[2] for row in team_rows), dtype=np.int64, count=rows)
+        rates = np.fromiter((row[3] for row in team_rows), dtype=np.int64, count=rows)
+
+        role_index, known = team_index(project_ids, team_project_ids)
+        counts = counts[known]
+        kept = 1 - self._discounts[np.minimum(starts[known] + counts, ends[known])]
+
+        base_costs = np.zeros(size, dtype=np.float64)
+        np.add.at(base_costs, role_index, counts * rates[known] * kept)
+        headcounts = np.zeros(size, dtype=np.int64)
+        np.add.at(headcounts, role_index, counts)
+
+        totals = base_costs * self._headcount_multiplier(headcounts) * coefficients
+        totals = np.where(rush, totals * self.rush_multiplier, totals)
+        totals = np.maximum(totals, self.minimum_fee)
+        has_roles = np.bincount(role_index, minlength=size) > 0
+        PRICE_CAP_HITS.inc(int(np.count_nonzero(has_roles & (totals > MAX_TOTAL_PRICE))))
+        totals = np.minimum(totals, MAX_TOTAL_PRICE)
+
+        return [
+            (project_id, total if priced else None)
+            for project_id, total, priced in zip(project_ids.tolist(), totals.tolist(), has_roles.tolist())
+        ]
+
+    def price_team(self, team_roles: list[dict], coefficient: float, rush: bool):
+        """Price of one team; `team_roles` are dicts with role_id, count and rate."""
+        if self.is_default:
+            return cap_total_price(calculate_cost(team_roles, [coefficient]))
+        team_rows = [(0, role["role_id"], role["count"], role["rate"]) for role in team_roles]
+        [(_, total_price)] = self.price_projects([(0, coefficient, rush)], team_rows)
+        return total_price
+
+    def price_surface(self, fixed_roles: list[dict], team_axes, coefficients, rush: bool):
+        """price_surface under this plan: `team_axes` holds (role_id, counts, rates) per varied role."""
+        if self.is_default:
+            fixed_base_cost = sum(role["count"] * role["rate"] for role in fixed_roles)
+            return price_surface(fixed_base_cost, [(counts, rates) for _, counts, rates in team_axes], coefficients)
+
+        base_costs = np.asarray(sum(
+            role["count"] * role["rate"] * float(self._kept_share(role["role_id"], np.int64(role["count"])))
+            for role in fixed_roles
+        ), dtype=np.float64)
+        headcounts = np.asarray(sum(role["count"] for role in fixed_roles), dtype=np.int64)
+        for role_id, counts, rates in team_axes:
+            counts = np.asarray(counts, dtype=np.int64)
+            rates = np.asarray(rates, dtype=np.int64)
+            # Discounts and headcount depend on the count only: give them a length-1 rate dimension
+            rate_dims = (1,) * rates.ndim
+            kept = self._kept_share(role_id, counts).reshape(counts.shape + rate_dims)
+            base_costs = np.add.outer(base_costs, np.multiply.outer(counts, rates) * kept)
+            headcounts = np.add.outer(headcounts, counts.reshape(counts.shape + rate_dims))
+
+        totals = np.multiply.outer(
+            base_costs * self._headcount_multiplier(headcounts), np.asarray(coefficients, dtype=np.float64)
+        )
+        if rush:
+            totals = totals * self.rush_multiplier
+        return np.minimum(np.maximum(totals, self.minimum_fee), MAX_TOTAL_PRICE)
+
+
+_plans: OrderedDict[int, PricingPlan] = OrderedDict()
+
+
+def get_pricing_plan(version: int, rules: dict) -> PricingPlan:
+    # Versions are immutable, so a compiled plan never goes stale; only the oldest ones are dropped
+    plan = _plans.get(version)
+    if plan is None:
+        plan = PricingPlan(version, PricingRules.model_validate(rules))
+        _plans[version] = plan
+        while len(_plans) > MAX_CACHED_PLANS:
+            _plans.popitem(last=False)
+    else:
+        _plans.move_to_end(version)
+    return plan
+
+
+async def current_pricing_plan() -> PricingPlan:
+    rule_set = await PricingRuleCRUD.get_current_rule_set()
+    return get_pricing_plan(rule_set["version"], rule_set["rules"])
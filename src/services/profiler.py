@@ -0,0 +1,144 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+import redis.asyncio as redis
+from fastapi import HTTPException, status
+from redis.asyncio.client import Pipeline
+
+from src.config import profiler_settings
+
+# Bind parameters, including expanded IN lists: "id IN ($1::INTEGER, $2::INTEGER)" -> "id IN (?)"
+_PARAMETER = r"(?:\$\d+(?:::\w+(?: WITH(?:OUT)? TIME ZONE)?(?:\[\])?)?|\?)"
+_PARAMETERS = re.compile(rf"{_PARAMETER}(?:\s*,\s*{_PARAMETER})*")
+
+
+def statement_shape(statement: str) -> str:
+    return _PARAMETERS.sub("?", " ".join(statement.split()))
+
+
+class RequestProfile:
+    """Round trips and time spent in the database and Redis while serving one request."""
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.redis_calls = 0
+        self.redis_seconds = 0.0
+        self.statements = Counter()
+
+    def repeated_statements(self, threshold: int) -> dict[str, int]:
+        # Count raw statements on the hot path, normalize only the distinct ones here
+        shapes = Counter()
+        for statement, count in self.statements.items():
+            shapes[statement_shape(statement)] += count
+        return {shape: count for shape, count in shapes.items() if count > threshold}
+
+    def server_timing(self, total_seconds: float) -> str:
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries", '
+            f'redis;dur={self.redis_seconds * 1000:.1f};desc="{self.redis_calls} round trips", '
+            f"total;dur={total_seconds * 1000:.1f}"
+        )
+
+
+_profile: ContextVar[RequestProfile | None] = ContextVar("request_profile", default=None)
+
+
+def record_query(statement: str, seconds: float):
+    profile = _profile.get()
+    if profile is not None:
+        profile.db_queries += 1
+        profile.db_seconds += seconds
+        profile.statements[statement] += 1
+
+
+def record_redis(seconds: float):
+    profile = _profile.get()
+    if profile is not None:
+        profile.redis_calls += 1
+        profile.redis_seconds += seconds
+
+
+def check_repeated_statements():
+    """With PROFILER_STRICT, fail the request if a statement shape repeated more than the threshold allows.
+
+    Called by the unit of work right before it commits, so a rejected request's writes are
+    rolled back rather than committed behind a 500.
+    """
+    profile = _profile.get()
+    if profile is None or not profiler_settings.PROFILER_STRICT:
+        return
+    repeated = profile.repeated_statements(profiler_settings.PROFILER_REPEAT_THRESHOLD)
+    if repeated:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "message": "Statement repeated more than the profiler threshold allows",
+                "statements": [{"statement": shape, "count": count} for shape, count in repeated.items()],
+            },
+        )
+
+
+class ProfiledPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            record_redis(time.perf_counter() - started)
+
+
+class ProfiledRedis(redis.Redis):
+    """Redis client that reports every round trip (a command or a whole pipeline) to the request profile."""
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            record_redis(time.perf_counter() - started)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> ProfiledPipeline:
+        return ProfiledPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class ProfilerMiddleware:
+    """Pure ASGI middleware: Server-Timing header and repeated-statement (N+1) detection.
+
+    A statement shape that runs more than PROFILER_REPEAT_THRESHOLD times in one request is
+    logged as a warning. PROFILER_STRICT failures are raised by the unit of work before it
+    commits (check_repeated_statements), never by replacing a response here.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiler_settings.PROFILER_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _profile.set(profile)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = [
+                    *message.get("headers", []),
+                    (b"server-timing", profile.server_timing(time.perf_counter() - started).encode()),
+                ]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _profile.reset(token)
+            for shape, count in profile.repeated_statements(profiler_settings.PROFILER_REPEAT_THRESHOLD).items():
+                logging.warning(
+                    f"Possible N+1 in {scope['method']} {scope['path']}: statement ran {count} times: {shape}"
+                )
@@ -0,0 +1,68 @@
+import csv
+import io
+
+import orjson
+from pydantic import ValidationError
+
+from src.schemas.project_role import ProjectRoleCreate, ProjectRoleImportError, PROJECT_ROLES_IMPORT_MAX_ROWS
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+def _read_records(body: bytes, fmt: str):
+    text = body.decode("utf-8-sig")
+    if fmt == "csv":
+        for record in csv.DictReader(io.StringIO(text)):
+            # An empty CSV cell means "not set", e.g. no custom rate
+            yield {field: value for field, value in record.items() if value not in ("", None)}
+        return
+    for line in text.splitlines():
+        if line.strip():
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                yield e
+
+
+def _error_message(error: ValidationError) -> str:
+    messages = []
+    for item in error.errors():
+        field = ".".join(str(part) for part in item["loc"])
+        messages.append(f"{field}: {item['msg']}" if field else item["msg"])
+    return "; ".join(messages)
+
+
+def parse_project_roles(
+        body: bytes, fmt: str
+) -> tuple[list[tuple[int, ProjectRoleCreate]], list[ProjectRoleImportError]]:
+    """Parse a CSV (with header) or NDJSON upload of project-role assignments.
+
+    Returns the valid rows with their 1-based row numbers and an error per rejected row.
+    A (project_id, role_id) pair may appear only once per file.
+    Raises ValueError if the file has more than PROJECT_ROLES_IMPORT_MAX_ROWS rows.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+    rows = []
+    errors = []
+    seen = {}
+    for row_number, record in enumerate(_read_records(body, fmt), start=1):
+        if row_number > PROJECT_ROLES_IMPORT_MAX_ROWS:
+            raise ValueError(f"Too many rows, at most {PROJECT_ROLES_IMPORT_MAX_ROWS} per import")
+        if isinstance(record, Exception):
+            errors.append(ProjectRoleImportError(row=row_number, message=f"Invalid JSON: {record}"))
+            continue
+        try:
+            project_role = ProjectRoleCreate.model_validate(record)
+        except ValidationError as e:
+            errors.append(ProjectRoleImportError(row=row_number, message=_error_message(e)))
+            continue
+
+        pair = (project_role.project_id, project_role.role_id)
+        if pair in seen:
+            errors.append(ProjectRoleImportError(row=row_number, message=f"Duplicate of row {seen[pair]}"))
+            continue
+        seen[pair] = row_number
+        rows.append((row_number, project_role))
+    return rows, errors
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+
+from src.config import db_settings, warmup_settings
+from src.db.database import async_engine, replica_engine
+from src.repositories.project import ProjectCRUD
+from src.repositories.project_role import ProjectRoleCRUD
+from src.repositories.role import RoleCRUD
+from src.services.cache import warm_up_redis
+from src.services.pricing_rules import current_pricing_plan
+
+
+async def fill_pool(engine, connections: int):
+    """Open `connections` connections at once and hand them back, leaving them idle in the pool."""
+    async with AsyncExitStack() as stack:
+        results = await asyncio.gather(
+            *(stack.enter_async_context(engine.connect()) for _ in range(connections)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+
+async def warm_up_db_pool():
+    connections = min(warmup_settings.WARMUP_DB_CONNECTIONS or db_settings.DB_POOL_SIZE, db_settings.DB_POOL_SIZE)
+    await fill_pool(async_engine, connections)
+    if replica_engine is not None:
+        await fill_pool(replica_engine, connections)
+
+
+async def warm_up_project_roles():
+    project_ids = await ProjectCRUD.get_recently_priced_project_ids(warmup_settings.WARMUP_RECENT_PROJECTS)
+    if project_ids:
+        await ProjectRoleCRUD.get_project_roles_by_project_ids(project_ids)
+
+
+class Warmup:
+    """Runs the startup steps in order and tracks them for the readiness probe.
+
+    A failing step is logged and retried every `retry_interval` seconds, so an
+    instance that starts before its database or Redis stays unready instead of
+    crashing. Readiness is withdrawn again as soon as shutdown begins.
+    """
+
+    def __init__(self, steps: dict, retry_interval: float):
+        self.steps = steps
+        self.retry_interval = retry_interval
+        self.status = {name: "pending" for name in steps}
+        self.errors: dict[str, str] = {}
+        self.stopping = False
+        self._task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        return not self.stopping and all(state == "done" for state in self.status.values())
+
+    def report(self) -> dict:
+        return {"ready": self.ready, "steps": dict(self.status), "errors": dict(self.errors)}
+
+    async def _run(self):
+        for name, step in self.steps.items():
+            self.status[name] = "running"
+            while True:
+                try:
+                    await step()
+                except Exception as e:
+                    logging.error(f"Warmup step {name} failed, retrying: {e}")
+                    self.errors[name] = str(e)
+                    await asyncio.sleep(self.retry_interval)
+                    continue
+                self.errors.pop(name, None)
+                self.status[name] = "done"
+                break
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self.stopping = True
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+warmup = Warmup(
+    steps={
+        "db_pool": warm_up_db_pool,
+        "redis": lambda: warm_up_redis(warmup_settings.WARMUP_REDIS_CONNECTIONS),
+        "pricing_rules": current_pricing_plan,
+        "roles": RoleCRUD.get_roles,
+        "project_roles": warm_up_project_roles,
+    } if warmup_settings.WARMUP_ENABLED else {},
+    retry_interval=warmup_settings.WARMUP_RETRY_INTERVAL,
+)
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException, Response
+
+from src.api.calculator import calculate_project_cost, calculate_projects_cost
+from src.config import pricing_settings
+from src.repositories.project import ProjectCRUD
+from src.repositories.project_role import ProjectRoleCRUD
+from src.repositories.role import RoleCRUD
+from src.schemas.calculator import ProjectBatchCalculateRequest
+from src.schemas.project import ProjectCreate
+from src.schemas.project_role import ProjectRoleCreate
+from src.schemas.role import RoleCreate
+from src.services.calculator import MAX_TOTAL_PRICE
+
+MISSING_PROJECT_ID = 999999
+
+
+async def create_projects() -> dict[str, int]:
+    lawyer = await RoleCRUD.create_role(RoleCreate(name="lawyer", default_rate=333))
+    partner = await RoleCRUD.create_role(RoleCreate(name="partner", default_rate=1000000))
+    custom_rate = await ProjectCRUD.create_project(ProjectCreate(name="custom rate", coefficient=1.15))
+    capped = await ProjectCRUD.create_project(ProjectCreate(name="capped", coefficient=3))
+    no_roles = await ProjectCRUD.create_project(ProjectCreate(name="no roles", coefficient=2))
+    await ProjectRoleCRUD.create_project_role(ProjectRoleCreate(project_id=custom_rate.id, role_id=lawyer.id, count=2))
+    await ProjectRoleCRUD.create_project_role(
+        ProjectRoleCreate(project_id=custom_rate.id, role_id=partner.id, count=3, custom_rate=97)
+    )
+    await ProjectRoleCRUD.create_project_role(ProjectRoleCreate(project_id=capped.id, role_id=partner.id, count=1000))
+    return {"custom_rate": custom_rate.id, "capped": capped.id, "no_roles": no_roles.id, "missing": MISSING_PROJECT_ID}
+
+
+async def price_one(project_id: int) -> tuple:
+    try:
+        result = await calculate_project_cost(project_id, Response(), None)
+    except HTTPException as e:
+        return None, e.detail
+    return result["total_price"], None
+
+
+async def price_both_ways() -> dict[str, tuple]:
+    ids = await create_projects()
+    single = {name: await price_one(project_id) for name, project_id in ids.items()}
+    batch = await calculate_projects_cost(ProjectBatchCalculateRequest(project_ids=list(ids.values())))
+    by_id = {result.project_id: (result.total_price, result.detail) for result in batch.results}
+    return {name: (single[name], by_id[project_id]) for name, project_id in ids.items()}
+
+
+def test_batch_results_match_the_per_project_endpoint(run, monkeypatch):
+    monkeypatch.setattr(pricing_settings, "PRICE_WRITE_BEHIND", False)
+    monkeypatch.setattr(pricing_settings, "PRICING_INCREMENTAL", False)
+
+    prices = run(price_both_ways)
+
+    for single, batch in prices.values():
+        assert single == batch
+    # The coefficient column is single precision
+    assert prices["custom_rate"][1] == (pytest.approx((2 * 333 + 3 * 97) * 1.15), None)
+    assert prices["capped"][1] == (MAX_TOTAL_PRICE, None)
+    assert prices["no_roles"][1] == (None, "No roles found for this project")
+    assert prices["missing"][1] == (None, "Project not found")
+
+
+def test_batch_accepts_aware_created_bounds(run):
+    async def scenario():
+        ids = await create_projects()
+        hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
+        batch = await calculate_projects_cost(ProjectBatchCalculateRequest(created_from=hour_ago.isoformat()))
+        return ids, {result.project_id for result in batch.results}
+
+    ids, priced = run(scenario)
+    assert priced == {ids["custom_rate"], ids["capped"], ids["no_roles"]}
@@ -0,0 +1,47 @@
+import pytest
+from fastapi import Response
+
+from src.api.calculator import calculate_project_cost
+from src.config import pricing_settings
+from src.db.database import new_async_session
+from src.db.models import ProjectModel, ProjectRoleModel, RoleModel
+from src.repositories.project import ProjectCRUD
+from src.services.etag import project_cost_etag
+from src.services.price_writer import price_writer
+from src.services.pricing_rules import current_pricing_plan
+
+
+async def create_unpriced_project() -> int:
+    # Rows written behind the repositories' back: total_price is still 0, so the calculator stores a new one
+    async with new_async_session() as session:
+        project = ProjectModel(name="unpriced", coefficient=1.5)
+        role = RoleModel(name="lawyer", default_rate=300)
+        session.add_all([project, role])
+        await session.flush()
+        session.add(ProjectRoleModel(project_id=project.id, role_id=role.id, count=2))
+        await session.commit()
+        return project.id
+
+
+async def calculate_then_current_etag(project_id: int) -> tuple[str, str, dict]:
+    response = Response()
+    result = await calculate_project_cost(project_id, response, None)
+    await price_writer.flush()
+    versions = await ProjectCRUD._load_project_versions(project_id)
+    plan = await current_pricing_plan()
+    return response.headers["ETag"], project_cost_etag(project_id, versions, plan.version), result
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_calculator_etag_matches_the_row_after_the_price_write(run, monkeypatch, write_behind):
+    monkeypatch.setattr(pricing_settings, "PRICE_WRITE_BEHIND", write_behind)
+    monkeypatch.setattr(pricing_settings, "PRICING_INCREMENTAL", False)
+    project_id = run(create_unpriced_project)
+
+    sent, current, result = run(calculate_then_current_etag, project_id)
+    assert result["project"].total_price == result["total_price"] == 900
+    assert sent == current
+
+    # Nothing changes on a second call: same price, same version, same ETag
+    sent_again, current_again, _ = run(calculate_then_current_etag, project_id)
+    assert sent_again == current_again == sent
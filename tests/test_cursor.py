@@ -0,0 +1,62 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from src.repositories.project import ProjectCRUD, decode_cursor, encode_cursor
+from src.schemas.project import ProjectCreate, ProjectListParams
+
+
+def make_cursor(position) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def test_round_trip():
+    project = SimpleNamespace(id=42, created_at=datetime(2026, 1, 2, 3, 4, 5))
+    assert decode_cursor(encode_cursor("id", project), "id") == {"order_by": "id", "id": 42}
+    assert decode_cursor(encode_cursor("created_at", project), "created_at") == {
+        "order_by": "created_at", "id": 42, "created_at": project.created_at,
+    }
+
+
+@pytest.mark.parametrize("cursor, order_by", [
+    ("not base64!", "id"),
+    (make_cursor(["id", 1]), "id"),
+    (make_cursor({"order_by": "created_at", "id": 1, "created_at": "2026-01-01T00:00:00"}), "id"),
+    (make_cursor({"order_by": "id"}), "id"),
+    (make_cursor({"order_by": "id", "id": "1"}), "id"),
+    (make_cursor({"order_by": "id", "id": 1.5}), "id"),
+    (make_cursor({"order_by": "id", "id": True}), "id"),
+    (make_cursor({"order_by": "id", "id": 2 ** 40}), "id"),
+    (make_cursor({"order_by": "id", "id": -1}), "id"),
+    (make_cursor({"order_by": "created_at", "id": 1, "created_at": 5}), "created_at"),
+    (make_cursor({"order_by": "created_at", "id": 1, "created_at": "yesterday"}), "created_at"),
+    (make_cursor({"order_by": "created_at", "id": 1, "created_at": "2026-01-01T00:00:00+02:00"}), "created_at"),
+])
+def test_malformed_cursors_are_value_errors(cursor, order_by):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, order_by)
+
+
+@pytest.mark.parametrize("created_from", ["2026-01-01T00:00:00Z", "2026-01-01T05:30:00+05:30"])
+def test_aware_filter_bounds_become_naive(created_from):
+    params = ProjectListParams(created_from=created_from)
+    assert params.created_from.tzinfo is None
+    assert params.created_from == datetime(2026, 1, 1, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+
+
+def test_aware_filter_bounds_select_by_the_stored_clock(run):
+    async def scenario():
+        project = await ProjectCRUD.create_project(ProjectCreate(name="p", coefficient=1))
+        hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
+        after = await ProjectCRUD.get_projects(ProjectListParams(created_from=hour_ago.isoformat()))
+        before = await ProjectCRUD.get_projects(
+            ProjectListParams(created_to=hour_ago.astimezone(timezone(timedelta(hours=-7))).isoformat())
+        )
+        return project.id, after, before
+
+    project_id, after, before = run(scenario)
+    assert [item.id for item in after.items] == [project_id]
+    assert before.items == []
@@ -0,0 +1,47 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.api.project import export_projects
+from src.repositories.project import ProjectCRUD
+from src.schemas.project import ProjectCreate, ProjectExportParams
+from src.services.export import start_batches
+
+
+async def failing_batches():
+    raise RuntimeError("query failed")
+    yield
+
+
+async def two_batches():
+    yield [(1,)]
+    yield [(2,)]
+
+
+async def collect(batches) -> list:
+    return [rows async for rows in batches]
+
+
+def test_start_batches_raises_before_anything_is_sent():
+    with pytest.raises(RuntimeError, match="query failed"):
+        asyncio.run(start_batches(failing_batches()))
+
+
+def test_start_batches_keeps_every_batch():
+    async def scenario():
+        return await collect(await start_batches(two_batches()))
+
+    assert asyncio.run(scenario()) == [[(1,)], [(2,)]]
+
+
+def test_export_with_aware_filter_bounds(run):
+    async def scenario():
+        project = await ProjectCRUD.create_project(ProjectCreate(name="p", coefficient=1))
+        hour_ahead = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
+        response = await export_projects(ProjectExportParams(created_to=hour_ahead))
+        return project.id, b"".join(await collect(response.body_iterator))
+
+    project_id, body = run(scenario)
+    assert body.count(b"\n") == 1
+    assert f'"id":{project_id}'.encode() in body
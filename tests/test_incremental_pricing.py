@@ -0,0 +1,90 @@
+from src.api.pricing_rule import create_rule_set
+from src.repositories.project import ProjectCRUD
+from src.repositories.project_role import ProjectRoleCRUD
+from src.repositories.role import RoleCRUD
+from src.schemas.project import ProjectCreate, ProjectUpdate
+from src.schemas.pricing_rule import PricingRuleSetCreate
+from src.schemas.project_role import ProjectRoleCreate, ProjectRoleUpdate
+from src.schemas.role import RoleCreate, RoleUpdate
+from src.services.calculator import calculate_cost
+from src.services.pricing_rules import current_pricing_plan
+
+
+async def stored_and_expected(project_id: int) -> tuple[int, int]:
+    snapshot = await ProjectCRUD.get_pricing_snapshot(project_id)
+    team_roles = [role.model_dump() for role in snapshot.team_roles]
+    return snapshot.project.total_price, int(calculate_cost(team_roles, [snapshot.project.coefficient]))
+
+
+def test_team_writes_keep_the_stored_price_current(run):
+    async def scenario():
+        project = await ProjectCRUD.create_project(ProjectCreate(name="p", coefficient=1.15))
+        lawyer = await RoleCRUD.create_role(RoleCreate(name="lawyer", default_rate=333))
+        clerk = await RoleCRUD.create_role(RoleCreate(name="clerk", default_rate=100))
+        prices = []
+
+        await ProjectRoleCRUD.create_project_role(ProjectRoleCreate(project_id=project.id, role_id=lawyer.id, count=2))
+        prices.append(await stored_and_expected(project.id))
+        clerks = await ProjectRoleCRUD.create_project_role(
+            ProjectRoleCreate(project_id=project.id, role_id=clerk.id, count=3, custom_rate=90)
+        )
+        prices.append(await stored_and_expected(project.id))
+        await ProjectRoleCRUD.update_project_role(clerks.id, ProjectRoleUpdate(count=5))
+        prices.append(await stored_and_expected(project.id))
+        await RoleCRUD.update_role(lawyer.id, RoleUpdate(default_rate=400))
+        prices.append(await stored_and_expected(project.id))
+        await ProjectCRUD.update_project(project.id, ProjectUpdate(coefficient=2))
+        prices.append(await stored_and_expected(project.id))
+        await ProjectRoleCRUD.delete_project_role(clerks.id)
+        prices.append(await stored_and_expected(project.id))
+        return prices
+
+    for stored, expected in run(scenario):
+        assert stored == expected
+
+
+async def stored_and_planned(project_id: int) -> tuple[int, int]:
+    snapshot = await ProjectCRUD.get_pricing_snapshot(project_id)
+    team_roles = [role.model_dump() for role in snapshot.team_roles]
+    plan = await current_pricing_plan()
+    project = snapshot.project
+    return project.total_price, int(plan.price_team(team_roles, project.coefficient, project.rush))
+
+
+def test_writes_under_pricing_rules_keep_the_stored_price_current(run):
+    async def scenario():
+        project = await ProjectCRUD.create_project(ProjectCreate(name="p", coefficient=1.15))
+        lawyer = await RoleCRUD.create_role(RoleCreate(name="lawyer", default_rate=333))
+        clerk = await RoleCRUD.create_role(RoleCreate(name="clerk", default_rate=100))
+        await ProjectRoleCRUD.create_project_role(ProjectRoleCreate(project_id=project.id, role_id=lawyer.id, count=2))
+        clerks = await ProjectRoleCRUD.create_project_role(
+            ProjectRoleCreate(project_id=project.id, role_id=clerk.id, count=3, custom_rate=90)
+        )
+        prices = []
+
+        published = await create_rule_set(PricingRuleSetCreate(rules={
+            "role_discounts": [{"role_id": clerk.id, "tiers": [{"min_count": 3, "discount": 0.25}]}],
+            "headcount_tiers": [{"min_headcount": 6, "multiplier": 0.9}],
+            "minimum_fee": 500,
+            "rush_multiplier": 1.5,
+        }))
+        assert published.repriced_projects == 1
+        prices.append(await stored_and_planned(project.id))
+        await ProjectRoleCRUD.update_project_role(clerks.id, ProjectRoleUpdate(count=5))
+        prices.append(await stored_and_planned(project.id))
+        await RoleCRUD.update_role(lawyer.id, RoleUpdate(default_rate=400))
+        prices.append(await stored_and_planned(project.id))
+        await ProjectCRUD.update_project(project.id, ProjectUpdate(coefficient=2))
+        prices.append(await stored_and_planned(project.id))
+        await ProjectCRUD.update_project(project.id, ProjectUpdate(rush=True))
+        prices.append(await stored_and_planned(project.id))
+        await ProjectRoleCRUD.delete_project_role(clerks.id)
+        prices.append(await stored_and_planned(project.id))
+        await ProjectRoleCRUD.import_project_roles(
+            [(1, ProjectRoleCreate(project_id=project.id, role_id=clerk.id, count=1))], []
+        )
+        prices.append(await stored_and_planned(project.id))
+        return prices
+
+    for stored, planned in run(scenario):
+        assert stored == planned
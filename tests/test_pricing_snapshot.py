@@ -0,0 +1,58 @@
+from src.db.database import new_async_session
+from src.db.models import ProjectModel, ProjectRoleModel, RoleModel
+from src.repositories.project import ProjectCRUD
+from src.services.profiler import RequestProfile, _profile
+
+
+async def create_project_with_team(team_size: int) -> int:
+    async with new_async_session() as session:
+        project = ProjectModel(name=f"team of {team_size}", coefficient=1.5)
+        roles = [RoleModel(name=f"role {i}", default_rate=100 + i) for i in range(team_size)]
+        session.add_all([project, *roles])
+        await session.flush()
+        session.add_all([
+            ProjectRoleModel(project_id=project.id, role_id=role.id, count=i + 1, custom_rate=50 if i % 2 else None)
+            for i, role in enumerate(roles)
+        ])
+        await session.commit()
+        return project.id
+
+
+async def snapshot_queries(project_id: int):
+    profile = RequestProfile()
+    token = _profile.set(profile)
+    try:
+        snapshot = await ProjectCRUD.get_pricing_snapshot(project_id)
+    finally:
+        _profile.reset(token)
+    return snapshot, profile.db_queries
+
+
+def test_snapshot_query_count_does_not_grow_with_team_size(run):
+    small_id = run(create_project_with_team, 1)
+    large_id = run(create_project_with_team, 25)
+
+    small, small_queries = run(snapshot_queries, small_id)
+    large, large_queries = run(snapshot_queries, large_id)
+
+    assert len(small.team_roles) == 1
+    assert len(large.team_roles) == 25
+    assert small_queries == large_queries == 1
+
+
+def test_snapshot_resolves_rates_and_keeps_empty_teams(run):
+    project_id = run(create_project_with_team, 2)
+    snapshot, _ = run(snapshot_queries, project_id)
+    assert sorted((role.count, role.rate) for role in snapshot.team_roles) == [(1, 100), (2, 50)]
+
+    async def create_empty_project():
+        async with new_async_session() as session:
+            project = ProjectModel(name="no team", coefficient=1)
+            session.add(project)
+            await session.commit()
+            return project.id
+
+    empty, _ = run(snapshot_queries, run(create_empty_project))
+    assert empty.project.name == "no team"
+    assert empty.team_roles == []
+    assert run(ProjectCRUD.get_pricing_snapshot, 10 ** 6) is None
@@ -0,0 +1,150 @@
+"""The repository hot paths must reach projects and project_roles through indexes.
+
+Every hot path runs against a seeded database inside a transaction that is rolled back.
+The SQL it emits is captured and EXPLAINed, and any sequential scan of a watched table
+fails the test.
+"""
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import event, func, select
+
+from benchmarks.seed import seed
+from src.db.database import async_engine, new_async_session, UnitOfWork, _unit_of_work
+from src.db.models import ProjectModel, ProjectRoleModel
+from src.repositories.project import ProjectCRUD, encode_cursor
+from src.repositories.project_role import ProjectRoleCRUD
+from src.schemas.calculator import ProjectBatchCalculateRequest
+from src.schemas.project import ProjectListParams
+from tests.conftest import empty_tables
+
+WATCHED_TABLES = {"projects", "project_roles"}
+
+# Large enough that the planner prefers the indexes, small enough to seed in seconds. Each role
+# is on ~0.4% of projects; one on a large share of them is rightly repriced with sequential scans
+PROJECTS = 50000
+ROLES = 2000
+TEAM_SIZE = 8
+
+
+def hot_path(sample: dict, name: str):
+    project_id = sample["project"].id
+    uses_default_rate = (
+        select(ProjectRoleModel.project_id)
+        .where(ProjectRoleModel.role_id == sample["role_id"], ProjectRoleModel.custom_rate.is_(None))
+    )
+    return {
+        "project roles by project": lambda session: ProjectRoleCRUD._load_project_roles_by_project_id(project_id),
+        "project roles by projects": lambda session: ProjectRoleCRUD._load_project_roles_by_project_ids(
+            sample["project_ids"]
+        ),
+        "pricing snapshot": lambda session: ProjectCRUD.get_pricing_snapshot(project_id),
+        "stored price": lambda session: ProjectCRUD.get_project_price(project_id),
+        "batch pricing rows": lambda session: ProjectCRUD.get_pricing_rows(
+            ProjectBatchCalculateRequest(project_ids=sample["project_ids"])
+        ),
+        "projects page by id": lambda session: ProjectCRUD.get_projects(
+            ProjectListParams(cursor=encode_cursor("id", sample["project"]))
+        ),
+        "projects page by created_at": lambda session: ProjectCRUD.get_projects(
+            ProjectListParams(order_by="created_at", cursor=encode_cursor("created_at", sample["project"]))
+        ),
+        "role default rate reprice": lambda session: ProjectCRUD.reprice_projects(session, uses_default_rate),
+    }[name]
+
+
+HOT_PATHS = [
+    "project roles by project",
+    "project roles by projects",
+    "pricing snapshot",
+    "stored price",
+    "batch pricing rows",
+    "projects page by id",
+    "projects page by created_at",
+    "role default rate reprice",
+]
+
+
+@asynccontextmanager
+async def rolled_back_unit_of_work():
+    # Repository writes run for real but never commit
+    uow = UnitOfWork(new_async_session())
+    token = _unit_of_work.set(uow)
+    try:
+        yield uow.session
+    finally:
+        _unit_of_work.reset(token)
+        await uow.session.rollback()
+        await uow.session.close()
+
+
+def sequential_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in WATCHED_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(sequential_scans(child))
+    return found
+
+
+async def explain(statements: list[tuple]) -> list[str]:
+    async with async_engine.connect() as conn:
+        raw_connection = await conn.get_raw_connection()
+        found = []
+        for statement, parameters in statements:
+            plan = await raw_connection.driver_connection.fetchval(
+                f"EXPLAIN (FORMAT JSON) {statement}", *(parameters or ())
+            )
+            # SQLAlchemy registers a json codec on its asyncpg connections; plain asyncpg returns text
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            found.extend(sequential_scans(plan[0]["Plan"]))
+        return found
+
+
+async def seed_and_sample() -> dict:
+    await empty_tables()
+    await seed(PROJECTS, ROLES, TEAM_SIZE)
+    async with new_async_session() as session:
+        total = (await session.execute(select(func.count(ProjectModel.id)))).scalar_one()
+        project_ids = (await session.execute(
+            select(ProjectModel.id).order_by(ProjectModel.id).offset(total // 2).limit(20)
+        )).scalars().all()
+        project = await session.get(ProjectModel, project_ids[0])
+        role_id = (await session.execute(
+            select(ProjectRoleModel.role_id).where(ProjectRoleModel.project_id == project.id).limit(1)
+        )).scalar_one()
+    return {"project": project, "project_ids": list(project_ids), "role_id": role_id}
+
+
+@pytest.fixture(scope="module")
+def sample(run_async):
+    return run_async(seed_and_sample)
+
+
+async def captured_scans(call) -> list[str]:
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with rolled_back_unit_of_work() as session:
+            await call(session)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+    assert captured, "the hot path ran no SQL"
+    return await explain(captured)
+
+
+@pytest.mark.parametrize("name", HOT_PATHS)
+def test_hot_path_uses_indexes(run_async, sample, name):
+    assert run_async(captured_scans, hot_path(sample, name)) == []
+
+
+def test_role_delete_foreign_key_check_uses_index(run_async, sample):
+    # Postgres runs this check itself when a role is deleted, not through the repositories
+    statement = "SELECT 1 FROM ONLY project_roles x WHERE role_id = $1 FOR KEY SHARE OF x"
+    assert run_async(explain, [(statement, (sample["role_id"],))]) == []
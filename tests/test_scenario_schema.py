@@ -0,0 +1,26 @@
+import pytest
+from pydantic import ValidationError
+
+from src.schemas.calculator import (ProjectScenarioRequest, SCENARIO_MAX_COEFFICIENT, SCENARIO_MAX_COUNT,
+                                    SCENARIO_MAX_RATE)
+
+
+@pytest.mark.parametrize("request_body", [
+    {"roles": [{"role_id": 1, "counts": [-1]}]},
+    {"roles": [{"role_id": 1, "counts": [SCENARIO_MAX_COUNT + 1]}]},
+    {"roles": [{"role_id": 1, "rates": [-5]}]},
+    {"roles": [{"role_id": 1, "rates": [SCENARIO_MAX_RATE + 1]}]},
+    {"coefficients": [-0.5]},
+    {"coefficients": [SCENARIO_MAX_COEFFICIENT * 2]},
+    {"coefficients": [float("inf")]},
+])
+def test_out_of_range_variations_are_rejected(request_body):
+    with pytest.raises(ValidationError):
+        ProjectScenarioRequest.model_validate(request_body)
+
+
+def test_bounds_are_inclusive():
+    ProjectScenarioRequest.model_validate({
+        "roles": [{"role_id": 1, "counts": [0, SCENARIO_MAX_COUNT], "rates": [0, SCENARIO_MAX_RATE]}],
+        "coefficients": [0, SCENARIO_MAX_COEFFICIENT],
+    })
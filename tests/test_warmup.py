@@ -0,0 +1,17 @@
+from src.repositories.project import ProjectCRUD
+from src.schemas.project import ProjectCreate
+
+
+def test_recently_priced_projects_are_the_ones_the_calculator_last_priced(run):
+    async def scenario():
+        first, unpriced, second = [
+            await ProjectCRUD.create_project(ProjectCreate(name=name, coefficient=1)) for name in ("a", "b", "c")
+        ]
+        await ProjectCRUD.set_project_prices({second.id: 500})
+        await ProjectCRUD.set_project_price(first.id, 700)
+        # An unchanged price is not a new pricing
+        await ProjectCRUD.set_project_prices({second.id: 500})
+        return [first.id, second.id], await ProjectCRUD.get_recently_priced_project_ids(10)
+
+    expected, recent = run(scenario)
+    assert recent == expected